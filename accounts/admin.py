@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, OTP
+from .models import CustomUser, OTP, OutboxEmail
 
 
 class CustomUserAdmin(UserAdmin):
@@ -46,5 +46,13 @@ class OTPAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    ordering = ("-created_at",)
+
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(OTP, OTPAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -1,15 +1,25 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Q, Value
+from django.db.models.functions import Upper
 from django.utils import timezone
 from .validators import ACCOUNT_LOCKOUT_ATTEMPTS, ACCOUNT_LOCKOUT_DURATION
 
 class EmailBackend(ModelBackend):
+    @staticmethod
+    def users_by_email(username):
+        """Case-insensitive email match that can use the UPPER(email) index"""
+        UserModel = get_user_model()
+        # Unlike email__iexact (LIKE on SQLite), this matches the indexed expression
+        return UserModel.objects.alias(email_upper=Upper("email")).filter(
+            email_upper=Upper(Value(username))
+        )
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
         try:
             # Try to fetch the user by email (case-insensitive)
-            user = UserModel.objects.get(email__iexact=username)
+            user = self.users_by_email(username).get()
             
             # Check if account is locked
             if hasattr(user, 'failed_login_attempts') and hasattr(user, 'last_failed_login'):
@@ -4,6 +4,7 @@ from django_ratelimit.decorators import ratelimit
 from django.http import HttpResponseRedirect
 from django.conf import settings
 from django.utils import timezone
+from .forms import OutboxPasswordResetForm
 
 # Function-based view for password reset with rate limiting
 @ratelimit(key='ip', rate='5/m', method='POST', block=True)
@@ -36,6 +37,7 @@ def password_reset_view(request, *args, **kwargs):
     
     # Create an instance of the standard PasswordResetView
     view = auth_views.PasswordResetView.as_view(
+        form_class=OutboxPasswordResetForm,
         template_name='registration/password_reset_form.html',
         email_template_name='registration/password_reset_email.html',
         subject_template_name='registration/password_reset_subject.txt',
@@ -1,51 +1,85 @@
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
+from .email_templates import get_email_templates
+from .models import OutboxEmail
+from .smtp_connection import persistent_connection
 
 class EmailService:
-    """Abstracts email sending functionality to make it easy to switch email providers."""
+    """Abstracts email sending functionality to make it easy to switch email providers.
+
+    Emails are written to the outbox table (in the caller's transaction) and
+    delivered by the `deliver_outbox` worker, so requests never wait on SMTP.
+    """
     
+    @staticmethod
+    def _outbox_row(subject, message, recipient_list, html_message=None, from_email=None,
+                    reply_to=None, attachment=None, attachment_name="", attachment_mimetype=""):
+        return OutboxEmail(
+            subject=subject,
+            body=message,
+            html_body=html_message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(recipient_list),
+            reply_to=list(reply_to or []),
+            attachment=attachment,
+            attachment_name=attachment_name,
+            attachment_mimetype=attachment_mimetype,
+        )
+
+    @staticmethod
+    def queue_email(subject, message, recipient_list, html_message=None, from_email=None,
+                    reply_to=None, attachment=None, attachment_name="", attachment_mimetype=""):
+        """Queue an email in the outbox and return the outbox row."""
+        email = EmailService._outbox_row(
+            subject, message, recipient_list, html_message=html_message, from_email=from_email,
+            reply_to=reply_to, attachment=attachment, attachment_name=attachment_name,
+            attachment_mimetype=attachment_mimetype,
+        )
+        email.save()
+        return email
+
+    @staticmethod
+    def queue_bulk(emails):
+        """Queue several emails with one INSERT and return the outbox rows.
+
+        Each item is a dict of queue_email's keyword arguments.
+        """
+        return OutboxEmail.objects.bulk_create([EmailService._outbox_row(**email) for email in emails])
+
+    @staticmethod
+    def send_bulk(messages):
+        """Send EmailMessage objects now, over this worker's persistent SMTP connection.
+
+        Only for code already running in a worker; request handlers queue
+        instead. Returns the number of messages sent.
+        """
+        return persistent_connection().send_messages(list(messages))
+
     @staticmethod
     def send_email(subject, message, recipient_list, html_message=None):
         """Send a simple email with the given subject and message."""
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                recipient_list,
-                html_message=html_message,
-                fail_silently=False,
-            )
+            EmailService.queue_email(subject, message, recipient_list, html_message=html_message)
             return True
         except Exception as e:
             # In a production environment, you would want to log this error
-            print(f"Error sending email: {e}")
+            print(f"Error queueing email: {e}")
             return False
     
     @staticmethod
     def send_template_email(subject, template_name, context, recipient_list):
-        """Send an email using a template for both plain text and HTML versions."""
+        """Send an email using a template for both plain text and HTML versions.
+
+        Either variant may be missing; templates are resolved once per process.
+        """
         try:
-            # Render plain text message
-            text_message = ""
-            try:
-                text_message = render_to_string(template_name + '.txt', context)
-            except Exception:
-                # Text template might not exist, that's okay
-                pass
-            
-            # Try to render HTML message if available
-            html_message = None
-            try:
-                html_message = render_to_string(template_name + '.html', context)
-            except Exception:
-                # HTML template might not exist, that's okay
-                pass
-            
+            text_template, html_template = get_email_templates(template_name)
+            text_message = text_template.render(context) if text_template else ""
+            html_message = html_template.render(context) if html_template else None
             return EmailService.send_email(subject, text_message, recipient_list, html_message)
         except Exception as e:
             print(f"Error sending template email: {e}")
@@ -0,0 +1,51 @@
+"""Email templates, resolved and compiled once per process.
+
+An email is rendered from ``<name>.txt`` and ``<name>.html``, and either
+may be missing (``otp_email`` only has HTML). Each name is looked up once.
+The compiled templates, or None for a missing variant, are kept so later
+sends skip the loaders and the ``TemplateDoesNotExist`` they would raise.
+Under the development server the cache is cleared whenever a file changes,
+so edited templates are picked up without a restart.
+"""
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.autoreload import file_changed
+
+_templates = {}
+
+
+def _resolve(name):
+    try:
+        return get_template(name)
+    except TemplateDoesNotExist:
+        return None
+
+
+def get_email_templates(template_name):
+    """Return ``(text_template, html_template)``, with None for a variant that does not exist."""
+    templates = _templates.get(template_name)
+    if templates is None:
+        templates = _templates[template_name] = (
+            _resolve(f"{template_name}.txt"),
+            _resolve(f"{template_name}.html"),
+        )
+    return templates
+
+
+def clear():
+    _templates.clear()
+
+
+@receiver(file_changed, dispatch_uid="accounts.email_templates.clear")
+def _clear_on_file_change(sender, file_path, **kwargs):
+    # The autoreloader sends this in DEBUG; Django resets its template loaders the same way
+    clear()
+
+
+@receiver(setting_changed)
+def _clear_on_templates_change(setting, **kwargs):
+    if setting == "TEMPLATES":
+        clear()
@@ -1,7 +1,12 @@
+import unicodedata
+
 from django import forms
-from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.forms import AuthenticationForm, PasswordResetForm
+from django.template import loader
 from django.utils import timezone
+from .backends import EmailBackend
 from .models import CustomUser, OTP
+from .email_service import EmailService
 
 
 class RegistrationForm(forms.ModelForm):
@@ -99,3 +104,31 @@ class CustomLoginForm(AuthenticationForm):
                     code="invalid_login",
                 )
             raise
+
+
+class OutboxPasswordResetForm(PasswordResetForm):
+    """Password reset form that queues the reset email in the outbox instead of sending it inline."""
+
+    def get_users(self, email):
+        """Active users with this email, including those without a usable password.
+
+        Django skips users with an unusable password, but here those are donors
+        created by import_donations, and password reset is how they sign in.
+        """
+        # The login backend's lookup, so both paths match alike and share the UPPER(email) index
+        users = EmailBackend.users_by_email(email).filter(is_active=True)
+        # Like Django, reject matches that only collide after case folding in the database
+        folded = unicodedata.normalize("NFKC", email).casefold()
+        return (user for user in users if unicodedata.normalize("NFKC", user.email).casefold() == folded)
+
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        # Email subject *must not* contain newlines
+        subject = "".join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+
+        EmailService.queue_email(subject, body, [to_email], html_message=html_body, from_email=from_email)
@@ -0,0 +1,106 @@
+"""A tiny in-process SMTP server standing in for the real relay in tests and benchmarks."""
+
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server.stub
+        with server.lock:
+            server.connections += 1
+        if server.handshake_delay:
+            server.delay_event.wait(server.handshake_delay)
+        self.reply("220 localhost local SMTP stand-in ready")
+        mail_from, rcpt_to = None, []
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = command[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command[8:].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk)
+                if server.delay:
+                    server.delay_event.wait(server.delay)
+                with server.lock:
+                    reject = server.reject_next > 0
+                    if reject:
+                        server.reject_next -= 1
+                    else:
+                        server.messages.append(
+                            {"from": mail_from, "to": rcpt_to, "data": b"".join(data)}
+                        )
+                self.reply("451 Temporarily rejected by stand-in" if reject else "250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """Accepts mail on 127.0.0.1 and keeps it in ``messages``.
+
+    ``reject_next`` makes the next N messages fail with a temporary error,
+    ``delay`` adds a per-message pause, to simulate a slow relay, and
+    ``handshake_delay`` a pause before each new connection is greeted, to
+    stand in for TLS setup and authentication. Usable as a context manager::
+
+        with LocalSMTPServer() as smtp:
+            settings.EMAIL_PORT = smtp.port
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0, handshake_delay=0):
+        self.messages = []
+        self.connections = 0
+        self.reject_next = 0
+        self.delay = delay
+        self.handshake_delay = handshake_delay
+        self.delay_event = threading.Event()
+        self.lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.stub = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
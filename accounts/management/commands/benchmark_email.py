@@ -0,0 +1,66 @@
+import time
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from accounts.email_service import EmailService
+from accounts.local_smtp import LocalSMTPServer
+from accounts.smtp_connection import persistent_connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Send emails to a local stand-in SMTP server over a new connection per message "
+        "and over the persistent worker connection, and compare throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200, help="Emails sent in each mode")
+        parser.add_argument(
+            "--handshake-delay", type=float, default=0.05,
+            help="Seconds the server waits before greeting a new connection, standing in for TLS and AUTH",
+        )
+        parser.add_argument("--delay", type=float, default=0, help="Seconds the server takes per message")
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        server = LocalSMTPServer(handshake_delay=options["handshake_delay"], delay=options["delay"])
+        with server as smtp, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST=smtp.host,
+            EMAIL_PORT=smtp.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        ):
+            self.stdout.write(f"{'mode':<12} {'messages':>8} {'seconds':>8} {'msgs/s':>8} {'connections':>11}")
+            for label, send in (("per message", self._send_per_message), ("persistent", self._send_persistent)):
+                connections, delivered = smtp.connections, len(smtp.messages)
+                start = time.perf_counter()
+                send(self._messages(count))
+                elapsed = time.perf_counter() - start
+                if len(smtp.messages) - delivered != count:
+                    raise CommandError(f"{label}: only {len(smtp.messages) - delivered} of {count} delivered")
+                self.stdout.write(
+                    f"{label:<12} {count:>8} {elapsed:>8.2f} {count / elapsed:>8.0f} "
+                    f"{smtp.connections - connections:>11}"
+                )
+            persistent_connection().close()
+
+    def _messages(self, count):
+        return [
+            EmailMessage(f"Benchmark {i}", "Body", "noreply@example.com", [f"user{i}@example.com"])
+            for i in range(count)
+        ]
+
+    def _send_per_message(self, messages):
+        # What send_mail does: open, send and close a connection for every message
+        for message in messages:
+            message.send()
+
+    def _send_persistent(self, messages):
+        # One call per message, as separate batches would be, sharing the worker connection
+        for message in messages:
+            EmailService.send_bulk([message])
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.outbox import deliver_pending
+from accounts.smtp_connection import persistent_connection
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over one persistent SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Emails claimed per batch")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when the outbox is empty")
+        parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit")
+
+    def handle(self, *args, **options):
+        # One SMTP connection for the life of the worker, kept alive between polls
+        connection = persistent_connection()
+        try:
+            while True:
+                # Long-running worker: drop connections the database has timed out
+                close_old_connections()
+                sent, failed = deliver_pending(batch_size=options["batch_size"])
+                if sent or failed or options["once"]:
+                    self.stdout.write(f"Outbox: {sent} sent, {failed} failed")
+                if options["once"]:
+                    break
+                connection.keepalive()
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
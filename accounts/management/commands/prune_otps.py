@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import OTP
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete OTPs older than the retention window in small batches by primary key, "
+        "so no single statement locks the OTP table for long"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Keep OTPs created in the last N days")
+        parser.add_argument("--batch-size", type=int, default=1000, help="OTPs deleted per statement")
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        # OTPs expire after five minutes, so anything past the window is used or expired.
+        # A fixed cutoff, so OTPs aging out while we run wait for the next run
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        old = OTP.objects.filter(created_at__lt=cutoff).order_by("pk")
+        deleted = 0
+        last_pk = 0
+        start = time.perf_counter()
+        while True:
+            # Walk the primary key from where the last batch stopped: there is no
+            # created_at index, and this keeps every batch a short range scan
+            pks = list(old.filter(pk__gt=last_pk).values_list("pk", flat=True)[: options["batch_size"]])
+            if not pks:
+                break
+            deleted += OTP.objects.filter(pk__in=pks).delete()[0]
+            last_pk = pks[-1]
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = time.perf_counter() - start
+        rate = deleted / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Deleted {deleted} OTPs older than {options['days']} days in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
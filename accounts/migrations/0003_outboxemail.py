@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_otp_salt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('html_body', models.TextField(blank=True, null=True)),
+                ('from_email', models.CharField(max_length=254)),
+                ('to', models.JSONField(default=list)),
+                ('reply_to', models.JSONField(blank=True, default=list)),
+                ('attachment', models.FileField(blank=True, null=True, upload_to='outbox_attachments/')),
+                ('attachment_name', models.CharField(blank=True, max_length=255)),
+                ('attachment_mimetype', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:49
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outboxemail'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='user_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user', 'created_at'], name='otp_user_unused_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.db.models.functions import Upper
 from django.utils import timezone
 import hashlib
 import random
@@ -39,6 +40,12 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive email lookups at login (see EmailBackend)
+            models.Index(Upper("email"), name="user_email_upper_idx"),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -50,6 +57,17 @@ class OTP(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Latest unused OTP of a user (verification and resend). Partial on
+            # is_used because boolean filters compile to a bare column test
+            models.Index(
+                fields=["user", "created_at"],
+                condition=models.Q(is_used=False),
+                name="otp_user_unused_idx",
+            ),
+        ]
+
     @staticmethod
     def generate_otp():
         return "".join(random.choices(string.digits, k=6))
@@ -72,4 +90,40 @@ class OTP(models.Model):
 
     def mark_as_used(self):
         self.is_used = True
-        self.save()
\ No newline at end of file
+        self.save()
+
+class OutboxEmail(models.Model):
+    """An email queued inside the request transaction and delivered later by `deliver_outbox`"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("SENDING", "Sending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True, null=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+    attachment = models.FileField(upload_to="outbox_attachments/", null=True, blank=True)
+    attachment_name = models.CharField(max_length=255, blank=True)
+    attachment_mimetype = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,146 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .smtp_connection import persistent_connection
+
+logger = logging.getLogger(__name__)
+
+# Retry defaults, overridable with the EMAIL_OUTBOX_* settings
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 30
+DEFAULT_MAX_BACKOFF_SECONDS = 3600
+# A SENDING row older than this belongs to a worker that died and is picked up again
+DEFAULT_CLAIM_TIMEOUT_SECONDS = 600
+
+
+def build_message(email, connection=None):
+    """Turn an outbox row into a Django email message"""
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+        reply_to=email.reply_to or None,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    if email.attachment:
+        with email.attachment.open("rb") as f:
+            message.attach(
+                email.attachment_name or email.attachment.name,
+                f.read(),
+                email.attachment_mimetype or None,
+            )
+    return message
+
+
+def claim_batch(batch_size):
+    """Claim up to batch_size due emails for this worker.
+
+    Rows are locked with SKIP LOCKED where the database supports it, so
+    several workers can drain the outbox without sending anything twice.
+    """
+    now = timezone.now()
+    claim_timeout = getattr(settings, "EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS", DEFAULT_CLAIM_TIMEOUT_SECONDS)
+    stale = now - timedelta(seconds=claim_timeout)
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="PENDING", next_attempt_at__lte=now)
+                | Q(status="SENDING", claimed_at__lt=stale)
+            )
+            .order_by("next_attempt_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if ids:
+            OutboxEmail.objects.filter(pk__in=ids).update(status="SENDING", claimed_at=now)
+    return list(OutboxEmail.objects.filter(pk__in=ids).order_by("next_attempt_at"))
+
+
+def _mark_sent(email):
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        status="SENT", sent_at=timezone.now(), attempts=F("attempts") + 1, last_error=None
+    )
+    if email.attachment:
+        email.attachment.delete(save=False)
+
+
+def _mark_failed(email, error):
+    max_attempts = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    backoff = getattr(settings, "EMAIL_OUTBOX_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)
+    max_backoff = getattr(settings, "EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", DEFAULT_MAX_BACKOFF_SECONDS)
+
+    attempts = email.attempts + 1
+    if attempts >= max_attempts:
+        status, next_attempt_at = "FAILED", timezone.now()
+    else:
+        delay = min(backoff * 2 ** (attempts - 1), max_backoff)
+        status, next_attempt_at = "PENDING", timezone.now() + timedelta(seconds=delay)
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        status=status, attempts=attempts, next_attempt_at=next_attempt_at, last_error=str(error)
+    )
+    return status
+
+
+def deliver_batch(emails, connection):
+    """Send the given outbox emails over one reused connection.
+
+    Returns a (sent, failed) tuple. A failed message is rescheduled with
+    exponential backoff and the connection is reopened for the next one.
+    The caller owns the connection and closes it when done.
+    """
+    sent = failed = 0
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                if not connection.send_messages([build_message(email, connection)]):
+                    raise RuntimeError("The email backend did not accept the message")
+                _mark_sent(email)
+                sent += 1
+            except Exception as e:
+                failed += 1
+                status = _mark_failed(email, e)
+                logger.warning("Outbox email %s failed (%s): %s", email.pk, status, e)
+                # The SMTP session may be unusable after an error; start a fresh one
+                connection.close()
+                connection.open()
+    except Exception as e:
+        # Could not (re)connect at all: put the unsent rest of the batch back with backoff
+        logger.error("Outbox delivery aborted: %s", e, exc_info=True)
+        for email in OutboxEmail.objects.filter(pk__in=[m.pk for m in emails], status="SENDING"):
+            _mark_failed(email, e)
+            failed += 1
+    return sent, failed
+
+
+def deliver_pending(batch_size=50, connection=None):
+    """Drain every due email in batches over a single connection; returns (sent, failed)
+
+    Without a connection the worker's persistent one is used and left open
+    for the next call. A connection passed in is closed when done.
+    """
+    persistent = connection is None
+    connection = connection or persistent_connection()
+    total_sent = total_failed = 0
+    try:
+        while True:
+            emails = claim_batch(batch_size)
+            if not emails:
+                break
+            sent, failed = deliver_batch(emails, connection)
+            total_sent += sent
+            total_failed += failed
+    finally:
+        if not persistent:
+            connection.close()
+    return total_sent, total_failed
@@ -0,0 +1,45 @@
+"""Session engine that only writes to the database when the session data changes.
+
+Reads come from the cache, falling back to the database (Django's
+``cached_db`` engine). Views often mark a session modified while storing the
+values it already holds, for example by refreshing a key with the same
+value or setting ``session.modified`` by hand, and the stock engine writes
+the row again on every such request. This engine keeps a copy of the data as
+loaded and skips the write when nothing differs, unless half of the
+session's lifetime has passed since it was last written. The expiry of an
+active session therefore still slides forward, at most one write per half
+lifetime, and the stored expiry is never less than half a lifetime away
+while the session is in use.
+"""
+
+import copy
+import time
+
+from django.contrib.sessions.backends import cached_db
+
+# When the session was last written, as a Unix timestamp
+SAVED_AT_KEY = "_session_saved_at"
+
+
+class SessionStore(cached_db.SessionStore):
+    def load(self):
+        data = super().load()
+        self._loaded_data = copy.deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self.session_key is not None
+            and self._session == getattr(self, "_loaded_data", None)
+            and not self._expiry_due()
+        ):
+            return
+        self._session[SAVED_AT_KEY] = int(time.time())
+        super().save(must_create=must_create)
+        self._loaded_data = copy.deepcopy(self._session)
+
+    def _expiry_due(self):
+        """True once half the session's lifetime has passed since it was last written"""
+        saved_at = self._session.get(SAVED_AT_KEY)
+        return saved_at is None or time.time() - saved_at >= self.get_expiry_age() / 2
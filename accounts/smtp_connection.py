@@ -0,0 +1,115 @@
+"""A long-lived SMTP connection per worker.
+
+Opening an SMTP connection costs a TCP and usually a TLS handshake plus
+authentication, which is more than sending a short message. The outbox
+worker therefore keeps one connection open between batches:
+
+- while idle, it is checked with ``NOOP`` every ``EMAIL_KEEPALIVE_SECONDS``
+  so the relay does not drop it;
+- after ``EMAIL_MAX_IDLE_SECONDS`` without a message it is closed, so an
+  idle worker does not hold a slot on the relay;
+- a connection that failed or went away is replaced on next use.
+"""
+
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULT_KEEPALIVE_SECONDS = 30
+DEFAULT_MAX_IDLE_SECONDS = 300
+
+
+class PersistentConnection:
+    """Wraps a Django email backend and keeps it open across sends.
+
+    It has the backend's ``open``/``close``/``send_messages`` interface, so it
+    can be passed wherever a connection is expected.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._last_used = 0.0
+        self._last_checked = 0.0
+
+    def _alive(self):
+        smtp = getattr(self._backend, "connection", False)
+        if smtp is False:
+            # Not an SMTP backend (console, locmem): nothing to keep alive
+            return True
+        if smtp is None:
+            return False
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def keepalive(self):
+        """Ping the relay if due, closing the connection once it is dead or idle too long.
+
+        The worker calls this between polls; ``open`` calls it before each use.
+        """
+        if self._backend is None:
+            return
+        now = time.monotonic()
+        max_idle = getattr(settings, "EMAIL_MAX_IDLE_SECONDS", DEFAULT_MAX_IDLE_SECONDS)
+        keepalive = getattr(settings, "EMAIL_KEEPALIVE_SECONDS", DEFAULT_KEEPALIVE_SECONDS)
+        if now - self._last_used >= max_idle:
+            self.close()
+        elif now - self._last_checked >= keepalive:
+            self._last_checked = now
+            if not self._alive():
+                self.close()
+
+    def open(self):
+        """Return an open backend, replacing the current one if it went stale."""
+        self.keepalive()
+        if self._backend is None:
+            backend = get_connection(fail_silently=False)
+            backend.open()
+            self._backend = backend
+            self._last_used = self._last_checked = time.monotonic()
+        return self._backend
+
+    def send_messages(self, messages):
+        """Send messages over the open connection; on error it is dropped and the error raised."""
+        backend = self.open()
+        try:
+            sent = backend.send_messages(messages)
+        except Exception:
+            self.close()
+            raise
+        self._last_used = self._last_checked = time.monotonic()
+        return sent
+
+    def close(self):
+        backend, self._backend = self._backend, None
+        if backend is not None:
+            try:
+                backend.close()
+            except Exception:
+                pass
+
+
+_local = threading.local()
+
+
+def persistent_connection():
+    """The calling thread's PersistentConnection, created on first use."""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = _local.connection = PersistentConnection()
+    return connection
+
+
+@receiver(setting_changed)
+def _reset_on_email_settings_change(setting, **kwargs):
+    # Tests point EMAIL_* at a different server; drop the connection to the old one
+    if setting.startswith("EMAIL_"):
+        connection = getattr(_local, "connection", None)
+        if connection is not None:
+            connection.close()
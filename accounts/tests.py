@@ -1,9 +1,30 @@
+import socket
+import time
+from pathlib import Path
+from unittest import mock
+
 from django.test import TestCase, Client
 from django.utils import timezone
 from datetime import timedelta
-from .models import CustomUser, OTP
+from io import StringIO
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import CommandError, call_command
+from .models import CustomUser, OTP, OutboxEmail
+from .email_service import EmailService
+from . import email_templates
+from .local_smtp import LocalSMTPServer
+from .outbox import deliver_pending
+from .smtp_connection import persistent_connection
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.autoreload import file_changed
+from .session_store import SessionStore
 
 # Create your tests here.
 
@@ -153,6 +174,15 @@ class AuthenticationTests(TestCase):
         # Check user is authenticated
         self.assertTrue(response.wsgi_request.user.is_authenticated)
 
+    def test_login_email_is_case_insensitive(self):
+        response = self.client.post(self.login_url, {
+            'username': 'Verified@Example.COM',
+            'password': 'testpass123'
+        })
+
+        self.assertRedirects(response, reverse('features:home'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+
     def test_login_invalid(self):
         response = self.client.post(self.login_url, {
             'username': 'verified@example.com',
@@ -181,3 +211,263 @@ class AuthenticationTests(TestCase):
         # Form should be invalid and not redirect
         self.assertEqual(response.status_code, 200)
         self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.smtp = LocalSMTPServer().start()
+        self.addCleanup(self.smtp.stop)
+        smtp_settings = self.settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST=self.smtp.host,
+            EMAIL_PORT=self.smtp.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        )
+        smtp_settings.enable()
+        self.addCleanup(smtp_settings.disable)
+        self.addCleanup(persistent_connection().close)
+
+    def test_send_email_only_queues(self):
+        self.assertTrue(EmailService.send_email("Hello", "Body", ["a@example.com"]))
+
+        self.assertEqual(self.smtp.messages, [])
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, "PENDING")
+        self.assertEqual(email.to, ["a@example.com"])
+
+    def test_worker_delivers_batch_over_one_connection(self):
+        for i in range(3):
+            EmailService.send_email(f"Hello {i}", "Body", [f"user{i}@example.com"])
+
+        call_command("deliver_outbox", "--once", stdout=StringIO())
+
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(OutboxEmail.objects.filter(status="SENT").count(), 3)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        EmailService.send_email("Hello", "Body", ["a@example.com"])
+        self.smtp.reject_next = 1
+
+        call_command("deliver_outbox", "--once", stdout=StringIO())
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, "PENDING")
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("451", email.last_error)
+
+        # Once the backoff has elapsed the worker tries again
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command("deliver_outbox", "--once", stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual(email.status, "SENT")
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        EmailService.send_email("Hello", "Body", ["a@example.com"])
+        OutboxEmail.objects.update(attempts=4)
+        self.smtp.reject_next = 1
+
+        with self.settings(EMAIL_OUTBOX_MAX_ATTEMPTS=5):
+            call_command("deliver_outbox", "--once", stdout=StringIO())
+
+        self.assertEqual(OutboxEmail.objects.get().status, "FAILED")
+
+    def test_queue_bulk_inserts_once(self):
+        with self.assertNumQueries(1):
+            emails = EmailService.queue_bulk(
+                {"subject": f"Hello {i}", "message": "Body", "recipient_list": [f"user{i}@example.com"]}
+                for i in range(5)
+            )
+        self.assertEqual(len(emails), 5)
+        self.assertEqual(OutboxEmail.objects.filter(status="PENDING").count(), 5)
+
+    def test_worker_connection_persists_between_runs(self):
+        EmailService.send_email("First", "Body", ["a@example.com"])
+        deliver_pending()
+        EmailService.send_email("Second", "Body", ["b@example.com"])
+        deliver_pending()
+        EmailService.send_bulk([EmailMessage("Direct", "Body", "noreply@example.com", ["c@example.com"])])
+
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+
+    def test_dropped_connection_is_replaced_before_sending(self):
+        with self.settings(EMAIL_KEEPALIVE_SECONDS=0):
+            EmailService.send_email("First", "Body", ["a@example.com"])
+            deliver_pending()
+            # The relay goes away while the worker is idle
+            persistent_connection().open().connection.sock.shutdown(socket.SHUT_RDWR)
+            EmailService.send_email("Second", "Body", ["b@example.com"])
+            deliver_pending()
+
+        self.assertEqual(OutboxEmail.objects.filter(status="SENT").count(), 2)
+        self.assertEqual(self.smtp.connections, 2)
+
+    def test_idle_connection_is_closed(self):
+        with self.settings(EMAIL_MAX_IDLE_SECONDS=0.1):
+            EmailService.send_email("First", "Body", ["a@example.com"])
+            deliver_pending()
+            time.sleep(0.2)
+            persistent_connection().keepalive()
+            self.assertEqual(self.smtp.connections, 1)
+            EmailService.send_email("Second", "Body", ["b@example.com"])
+            deliver_pending()
+
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(self.smtp.connections, 2)
+
+    def test_registration_does_not_send_inline(self):
+        self.client.post(reverse("register"), {
+            "email": "newuser@example.com",
+            "full_name": "New User",
+            "password": "Testpass123!",
+            "confirm_password": "Testpass123!",
+        })
+
+        self.assertEqual(self.smtp.messages, [])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.get().to, ["newuser@example.com"])
+
+
+class EmailTemplateCacheTests(TestCase):
+    def setUp(self):
+        email_templates.clear()
+        self.user = CustomUser.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+
+    def send_verification(self):
+        with mock.patch.object(email_templates, "get_template", wraps=email_templates.get_template) as lookups:
+            self.assertTrue(EmailService.send_verification_email(self.user, "123456"))
+        return lookups.call_count
+
+    def test_templates_are_resolved_once(self):
+        self.assertEqual(self.send_verification(), 2)
+        self.assertEqual(self.send_verification(), 0)
+
+        first, second = OutboxEmail.objects.order_by("pk")
+        self.assertIn("123456", second.html_body)
+        self.assertEqual(second.html_body, first.html_body)
+        self.assertEqual(second.body, "")
+
+    def test_missing_variant_is_remembered(self):
+        text_template, html_template = email_templates.get_email_templates("accounts/email/otp_email")
+        self.assertIsNone(text_template)
+        self.assertIsNotNone(html_template)
+
+    def test_file_change_clears_cache(self):
+        self.send_verification()
+        file_changed.send(sender=None, file_path=Path("accounts/templates/accounts/email/otp_email.html"))
+        self.assertEqual(self.send_verification(), 2)
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def session_writes(self, queries):
+        return [q["sql"] for q in queries.captured_queries if q["sql"].startswith(("INSERT", "UPDATE")) and "django_session" in q["sql"]]
+
+    def test_unchanged_session_is_not_written(self):
+        session = SessionStore()
+        session["email"] = "a@example.com"
+        session.create()
+
+        reloaded = SessionStore(session.session_key)
+        reloaded["email"] = "a@example.com"
+        reloaded.modified = True
+        with CaptureQueriesContext(connection) as queries:
+            reloaded.save()
+
+        self.assertEqual(self.session_writes(queries), [])
+
+    def test_active_session_expiry_moves_forward(self):
+        session = SessionStore()
+        session["email"] = "a@example.com"
+        session.create()
+        # Stored expiry close to running out
+        Session.objects.update(expire_date=timezone.now() + timedelta(minutes=5))
+
+        reloaded = SessionStore(session.session_key)
+        reloaded.modified = True
+        half_life_later = time.time() + settings.SESSION_COOKIE_AGE / 2
+        with mock.patch("accounts.session_store.time.time", return_value=half_life_later):
+            reloaded.save()
+
+        expire_date = Session.objects.get().expire_date
+        self.assertGreater(expire_date, timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE - 60))
+
+    def test_changed_session_is_written_and_cached(self):
+        session = SessionStore()
+        session["email"] = "a@example.com"
+        session.create()
+
+        reloaded = SessionStore(session.session_key)
+        reloaded["email"] = "b@example.com"
+        reloaded.save()
+
+        self.assertEqual(Session.objects.get().get_decoded()["email"], "b@example.com")
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session.session_key)["email"], "b@example.com")
+
+    def test_registration_writes_the_session_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("register"), {
+                "email": "newuser@example.com",
+                "full_name": "New User",
+                "password": "Testpass123!",
+                "confirm_password": "Testpass123!",
+            })
+
+        self.assertEqual(len(self.session_writes(queries)), 1)
+        self.assertEqual(self.client.session["email"], "newuser@example.com")
+        self.assertEqual(self.client.get(reverse("verify_otp")).status_code, 200)
+
+    def test_prune_sessions_deletes_only_expired_rows(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f"expired{i}", session_data="", expire_date=now - timedelta(hours=1)) for i in range(5)]
+            + [Session(session_key="live", session_data="", expire_date=now + timedelta(hours=1))]
+        )
+        out = StringIO()
+
+        call_command("prune_sessions", batch_size=2, stdout=out)
+
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["live"])
+        self.assertIn("Deleted 5 expired sessions", out.getvalue())
+
+
+class PruneOTPsTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+
+    def create_otp(self, age, is_used=False):
+        otp = OTP.objects.create(user=self.user, otp_hash="x", salt="y", is_used=is_used)
+        OTP.objects.filter(pk=otp.pk).update(created_at=timezone.now() - age)
+        return otp
+
+    def test_deletes_only_otps_past_retention(self):
+        for i in range(5):
+            self.create_otp(timedelta(days=8), is_used=i % 2 == 0)
+        recent_used = self.create_otp(timedelta(days=1), is_used=True)
+        live = self.create_otp(timedelta(minutes=1))
+        # Newest pk but oldest row, as after a backfill
+        self.create_otp(timedelta(days=30))
+        out = StringIO()
+
+        call_command("prune_otps", days=7, batch_size=2, stdout=out)
+
+        self.assertQuerySetEqual(
+            OTP.objects.order_by("pk").values_list("pk", flat=True), [recent_used.pk, live.pk]
+        )
+        self.assertIn("Deleted 6 OTPs older than 7 days", out.getvalue())
+
+    def test_rejects_retention_below_one_day(self):
+        with self.assertRaises(CommandError):
+            call_command("prune_otps", days=0, stdout=StringIO())
@@ -41,8 +41,6 @@ class RegisterView(CreateView):
         # Store email and registration timestamp in session
         self.request.session["email"] = user.email
         self.request.session["registration_timestamp"] = timezone.now().isoformat()
-        self.request.session.modified = True  # Ensure session is marked as modified
-        self.request.session.save()  # Explicitly save the session to ensure data persists
 
         # Log the registration attempt
         ip_address = self.request.META.get('REMOTE_ADDR')
@@ -135,8 +133,6 @@ class VerifyOTPView(FormView):
         else:
             # If no timestamp in session, add one now to prevent further issues
             request.session["registration_timestamp"] = timezone.now().isoformat()
-            request.session.modified = True
-            request.session.save()
             logger.info(f"Added missing registration timestamp for email: {email}")
         
         return super().get(request, *args, **kwargs)
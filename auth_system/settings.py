@@ -59,6 +59,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in SQL profiling: query counts, N+1 warnings, slow request logs and a
+# Server-Timing header on every response (features.middleware)
+QUERY_PROFILER = os.getenv("QUERY_PROFILER", "False") == "True"
+QUERY_PROFILER_SLOW_MS = int(os.getenv("QUERY_PROFILER_SLOW_MS", 500))
+QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_PROFILER_N_PLUS_ONE_THRESHOLD", 5))
+if QUERY_PROFILER:
+    MIDDLEWARE.insert(0, "features.middleware.QueryProfilerMiddleware")
+
 ROOT_URLCONF = "auth_system.urls"
 
 TEMPLATES = [
@@ -102,6 +110,35 @@ else:
         }
     }
 
+# Cache
+# CACHE_BACKEND picks the backend: "locmem" (per process), "file" (a
+# directory shared by every worker on the host) or "redis" (REDIS_URL).
+# Shared backends keep gunicorn workers coherent, so production defaults to
+# redis when REDIS_URL is set and to file otherwise; development uses locmem.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "locmem" if DEBUG else "file")
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Seconds a cached page query lives (features.cache)
+FEATURES_CACHE_TIMEOUT = int(os.getenv("FEATURES_CACHE_TIMEOUT", 300))
+
 
 
 
@@ -147,12 +184,17 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "static/"
-STATIC_ROOT = BASE_DIR / "staticfiles"
+# Overridable so a throwaway server (see the load_test command) can collect elsewhere
+STATIC_ROOT = Path(os.getenv("STATIC_ROOT", BASE_DIR / "staticfiles"))
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
 # Media files (Uploads)
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
+# Overridable so production can point it at a persistent disk (see render.yaml)
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / "media"))
+
+# Disk budget for cached donor report files (features.report_cache)
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", 500 * 1024 * 1024))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
@@ -219,6 +261,14 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',  # Keep default as fallback
 ]
 
+# django-ratelimit switch; the load_test command turns it off so one client IP
+# can log in many times
+RATELIMIT_ENABLE = os.getenv("RATELIMIT_ENABLE", "True") == "True"
+
+# Sessions are read through the cache and only written when their data
+# changes (accounts.session_store); SESSION_CACHE_ALIAS picks the cache
+SESSION_ENGINE = "accounts.session_store"
+
 # Session security settings
 SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", 3600))  # Default to 1 hour
 CSRF_COOKIE_AGE = int(os.getenv("CSRF_COOKIE_AGE", 3600))  # Default to 1 hour
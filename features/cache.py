@@ -0,0 +1,171 @@
+"""Cached reads for the public campaign and donation pages.
+
+Entries live in the configured Django cache (see CACHES in settings) under
+versioned keys. Each key embeds the current version token of the namespaces
+it depends on, for example one campaign, the campaign list, donations,
+expenses or the platform stats. Invalidating a namespace replaces its token,
+so every entry built from it becomes unreachable at once and simply expires.
+The tokens live in the same cache, which keeps several workers coherent when
+the cache is shared (file or Redis backends).
+
+Model signals invalidate on save and delete (see features.signals). Writes
+that bypass signals, such as queryset ``update()`` and ``bulk_create()``,
+must call the ``invalidate_*`` helpers themselves.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Campaign, Donation, Expense, PlatformStats
+from .pagination import decode_cursor, keyset_paginate
+
+DEFAULT_TIMEOUT = 300
+
+CAMPAIGNS = "campaigns"
+DONATIONS = "donations"
+EXPENSES = "expenses"
+STATS = "stats"
+
+
+def _timeout():
+    return getattr(settings, "FEATURES_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _version_key(namespace):
+    return f"features:version:{namespace}"
+
+
+def campaign_namespace(campaign_id):
+    return f"campaign:{campaign_id}"
+
+
+def _versions(*namespaces):
+    """Current version tokens of the given namespaces, creating missing ones"""
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    tokens = []
+    for key in keys:
+        token = found.get(key)
+        if token is None:
+            # A fresh random token, so entries from before an eviction are never reused
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            token = cache.get(key)
+        tokens.append(token)
+    return tokens
+
+
+def cache_key(name, *namespaces):
+    return f"features:{name}:" + ":".join(_versions(*namespaces))
+
+
+def get_or_build(name, namespaces, build):
+    """Return the cached value for ``name`` or build, store and return it"""
+    key = cache_key(name, *namespaces)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, _timeout())
+    return value
+
+
+def _bump(*namespaces):
+    cache.set_many({_version_key(namespace): uuid.uuid4().hex for namespace in namespaces}, timeout=None)
+
+
+def invalidate(*namespaces):
+    """Invalidate namespaces once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: _bump(*namespaces))
+
+
+def invalidate_campaigns(*campaign_ids):
+    invalidate(CAMPAIGNS, *[campaign_namespace(pk) for pk in campaign_ids])
+
+
+def invalidate_donations(*campaign_ids):
+    invalidate(DONATIONS, STATS, CAMPAIGNS, *[campaign_namespace(pk) for pk in campaign_ids])
+
+
+def invalidate_stats():
+    invalidate(STATS)
+
+
+def get_platform_stats():
+    return get_or_build("platform_stats", [STATS], PlatformStats.load)
+
+
+def get_active_campaigns(today):
+    return get_or_build(
+        f"active_campaigns:{today.isoformat()}",
+        [CAMPAIGNS],
+        lambda: list(
+            Campaign.objects.with_live_totals()
+            .filter(is_active=True, end_date__gte=today)
+            .order_by("-created_at")
+        ),
+    )
+
+
+def get_campaign_page(cursor, page_size):
+    ordering = ("-created_at", "-id")
+
+    def build():
+        return keyset_paginate(Campaign.objects.with_live_totals(), cursor, ordering, page_size=page_size)
+
+    position = ""
+    if cursor:
+        # The cursor comes from the query string, so key on the campaign it points
+        # at rather than the raw text. A malformed or made-up cursor is built
+        # uncached, which bounds the number of keys by the number of campaigns.
+        values = decode_cursor(cursor, Campaign, [field.lstrip("-") for field in ordering])
+        if values is None or not Campaign.objects.filter(created_at=values[0], pk=values[1]).exists():
+            return build()
+        position = values[1]
+    return get_or_build(f"campaign_page:{page_size}:{position}", [CAMPAIGNS], build)
+
+
+def get_campaign(campaign_id):
+    """The campaign with live totals, or None if it does not exist"""
+    campaigns = get_or_build(
+        f"campaign:{campaign_id}",
+        [campaign_namespace(campaign_id)],
+        # Cache a (possibly empty) list so a missing campaign is cached too
+        lambda: list(Campaign.objects.with_live_totals().filter(pk=campaign_id)),
+    )
+    return campaigns[0] if campaigns else None
+
+
+# Only what the donation lists display, so cached donors carry their name
+# and not the rest of the account (email, password hash)
+RECENT_DONATION_FIELDS = ("donation_date", "amount", "donor__full_name")
+
+
+def get_recent_donations(campaign_id, limit=10):
+    return get_or_build(
+        f"recent_donations:{campaign_id}:{limit}",
+        [campaign_namespace(campaign_id)],
+        lambda: list(
+            Donation.objects.filter(campaign_id=campaign_id, status="COMPLETED")
+            .select_related("donor")
+            .only(*RECENT_DONATION_FIELDS)
+            .order_by("-donation_date")[:limit]
+        ),
+    )
+
+
+def get_fund_usage(limit=50):
+    return get_or_build(
+        f"fund_usage:{limit}",
+        [DONATIONS, EXPENSES],
+        lambda: (
+            list(
+                Donation.objects.filter(status="COMPLETED")
+                .select_related("donor", "campaign")
+                .only(*RECENT_DONATION_FIELDS, "message", "campaign__title")
+                .order_by("-donation_date")[:limit]
+            ),
+            list(Expense.objects.select_related("campaign").order_by("-date")[:limit]),
+        ),
+    )
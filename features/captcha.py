@@ -0,0 +1,50 @@
+"""Stateless math CAPTCHA for the contact form.
+
+The question is carried in a signed, short-lived token rendered into the
+form, so showing the page stores nothing server side. The token holds a
+random nonce and an HMAC of the answer, never the answer itself. Each nonce
+is accepted once: verifying it records it in the cache until the token
+would have expired anyway.
+"""
+
+import random
+import secrets
+
+from django.core import signing
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+SALT = "features.captcha"
+# Seconds a visitor has to submit the form
+TOKEN_MAX_AGE = 30 * 60
+
+
+def _answer_digest(nonce, answer):
+    return salted_hmac(SALT, f"{nonce}:{answer}").hexdigest()
+
+
+def issue():
+    """Return a ``(question, token)`` pair for a new CAPTCHA."""
+    a = random.randint(1, 9)
+    b = random.randint(1, 9)
+    nonce = secrets.token_urlsafe(12)
+    token = signing.dumps({"n": nonce, "h": _answer_digest(nonce, a + b)}, salt=SALT, compress=True)
+    return f"{a} + {b}", token
+
+
+def verify(token, answer):
+    """Check ``answer`` against ``token``, consuming the token.
+
+    A token is spent by any attempt, right or wrong, so one question cannot
+    be brute-forced or replayed.
+    """
+    if not token or answer is None:
+        return False
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=TOKEN_MAX_AGE)
+        nonce, digest = payload["n"], payload["h"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return False
+    if not cache.add(f"captcha:used:{nonce}", True, timeout=TOKEN_MAX_AGE):
+        return False
+    return constant_time_compare(digest, _answer_digest(nonce, answer))
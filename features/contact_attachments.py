@@ -0,0 +1,72 @@
+"""Contact form attachments, kept in media storage and shared by signed link.
+
+Uploads are spooled to a temporary file and copied to storage chunk by chunk,
+so a submission never holds the whole file in memory. The admin email carries
+a signed download link that expires, instead of the file itself, which keeps
+outgoing SMTP messages small. Once every link to a file has expired the file
+is unreachable, and ``prune()`` (the prune_contact_attachments command)
+removes it.
+"""
+
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+
+SALT = "features.contact_attachments"
+UPLOAD_DIR = "contact_attachments"
+
+
+def link_max_age():
+    # Seconds a download link stays valid (7 days by default)
+    return getattr(settings, "CONTACT_ATTACHMENT_LINK_MAX_AGE", 7 * 24 * 60 * 60)
+
+
+def store(uploaded_file):
+    """Save an uploaded file to storage and return its storage name."""
+    filename = os.path.basename(getattr(uploaded_file, "name", "") or "attachment")
+    return default_storage.save(f"{UPLOAD_DIR}/{uuid.uuid4().hex}/{filename}", uploaded_file)
+
+
+def download_url(request, name, content_type):
+    """Return an absolute, signed link to a stored attachment."""
+    token = signing.dumps({"name": name, "type": content_type}, salt=SALT)
+    return request.build_absolute_uri(reverse("features:contact_attachment", args=[token]))
+
+
+def load(token):
+    """Return ``(name, content_type)`` for a link token, or None if it is invalid or expired."""
+    try:
+        data = signing.loads(token, salt=SALT, max_age=link_max_age())
+        return data["name"], data["type"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def prune():
+    """Delete stored attachments older than the link lifetime; returns the number of files deleted."""
+    cutoff = timezone.now() - timedelta(seconds=link_max_age())
+    if not default_storage.exists(UPLOAD_DIR):
+        return 0
+    deleted = 0
+    folders, _ = default_storage.listdir(UPLOAD_DIR)
+    for folder in folders:
+        path = f"{UPLOAD_DIR}/{folder}"
+        _, files = default_storage.listdir(path)
+        remaining = len(files)
+        for filename in files:
+            name = f"{path}/{filename}"
+            # Links are signed at upload, so nothing can reach a file older than a link lives
+            if default_storage.get_modified_time(name) < cutoff:
+                default_storage.delete(name)
+                deleted += 1
+                remaining -= 1
+        if not remaining:
+            # Each upload has its own folder; remove it once empty
+            default_storage.delete(path)
+    return deleted
@@ -1,5 +1,6 @@
 from django import forms
 from .models import Campaign, Donation, DonorProfile, Expense, DonorReport
+from . import captcha
 from django.utils import timezone
 from datetime import date, timedelta
 import mimetypes
@@ -136,7 +137,7 @@ class ContactForm(forms.Form):
     captcha = forms.IntegerField(required=True)
 
     def __init__(self, *args, **kwargs):
-        self.expected_captcha = kwargs.pop("expected_captcha", None)
+        self.captcha_token = kwargs.pop("captcha_token", None)
         super().__init__(*args, **kwargs)
         # Add basic CSS classes to widgets for consistency with existing styles
         self.fields["name"].widget.attrs.update({"class": "form-control", "placeholder": "Your full name"})
@@ -171,6 +172,6 @@ class ContactForm(forms.Form):
 
     def clean_captcha(self):
         value = self.cleaned_data.get("captcha")
-        if self.expected_captcha is None or value != self.expected_captcha:
+        if not captcha.verify(self.captcha_token, value):
             raise forms.ValidationError("CAPTCHA verification failed. Please try again.")
         return value
@@ -0,0 +1,127 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.utils import timezone
+
+from features.models import Campaign, Donation, DonorProfile
+from features.services import commit_donation, fold_campaign_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent donations against the configured database, verify the "
+        "final totals are exact and report donations per second"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent donor threads")
+        parser.add_argument("--donations", type=int, default=50, help="Donations made by each thread")
+        parser.add_argument("--amount", type=Decimal, default=Decimal("10.00"), help="Amount of each donation")
+        parser.add_argument(
+            "--mode",
+            choices=["plain", "sharded", "both"],
+            default="both",
+            help="Update the campaign row directly, through counter shards, or compare both",
+        )
+        parser.add_argument("--shards", type=int, default=8, help="Counter shards per campaign in sharded mode")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark rows instead of deleting them")
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        per_thread = options["donations"]
+        amount = options["amount"]
+        modes = ["plain", "sharded"] if options["mode"] == "both" else [options["mode"]]
+
+        self.stdout.write(
+            f"Database: {connection.vendor} | threads: {threads} | donations per thread: {per_thread}"
+        )
+        for mode in modes:
+            sharded = mode == "sharded"
+            campaign, donors = self._create_fixtures(threads, sharded, options["shards"])
+            self.stdout.write(f"\n[{mode}]")
+            try:
+                elapsed, completed, errors = self._run(campaign, donors, per_thread, amount)
+                if sharded:
+                    fold_campaign_shards(campaign.pk)
+                self._report(campaign, donors, completed, errors, elapsed, amount)
+            finally:
+                if not options["keep"]:
+                    campaign.delete()
+                    get_user_model().objects.filter(pk__in=[d.pk for d in donors]).delete()
+
+    def _create_fixtures(self, threads, sharded, shards):
+        """Create a throwaway campaign and one donor account per thread"""
+        run_id = uuid.uuid4().hex[:8]
+        today = timezone.now().date()
+        campaign = Campaign.objects.create(
+            title=f"Benchmark campaign {run_id}",
+            description="Created by benchmark_donations",
+            target_amount=Decimal("99999999.99"),
+            start_date=today,
+            end_date=today + timedelta(days=30),
+            use_sharded_counter=sharded,
+            counter_shard_count=shards,
+        )
+
+        User = get_user_model()
+        donors = []
+        for i in range(threads):
+            user = User(email=f"bench-{run_id}-{i}@example.com", full_name=f"Benchmark Donor {i}")
+            # No password hashing needed for synthetic donors
+            user.set_unusable_password()
+            donors.append(user)
+        User.objects.bulk_create(donors)
+        donors = list(User.objects.filter(email__startswith=f"bench-{run_id}-").order_by("email"))
+        return campaign, donors
+
+    def _run(self, campaign, donors, per_thread, amount):
+        barrier = threading.Barrier(len(donors))
+        completed = {donor.pk: 0 for donor in donors}
+        errors = []
+
+        def worker(donor):
+            try:
+                barrier.wait()
+                for _ in range(per_thread):
+                    try:
+                        commit_donation(donor, campaign, amount, "UPI")
+                        completed[donor.pk] += 1
+                    except Exception as e:
+                        errors.append(e)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker, args=(donor,)) for donor in donors]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start, completed, errors
+
+    def _report(self, campaign, donors, completed, errors, elapsed, amount):
+        total_completed = sum(completed.values())
+        campaign.refresh_from_db()
+        expected_total = amount * total_completed
+
+        ok = campaign.collected_amount == expected_total
+        ok &= Donation.objects.filter(campaign=campaign).count() == total_completed
+        for donor in donors:
+            profile = DonorProfile.objects.get(user=donor)
+            ok &= profile.total_donations == amount * completed[donor.pk]
+
+        rate = total_completed / elapsed if elapsed else 0
+        self.stdout.write(f"Completed donations: {total_completed} in {elapsed:.2f}s ({rate:.1f} donations/s)")
+        self.stdout.write(f"Campaign total: ₹{campaign.collected_amount} (expected ₹{expected_total})")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{len(errors)} donations failed: {errors[0]}"))
+        if ok:
+            self.stdout.write(self.style.SUCCESS("Final totals are exact."))
+        else:
+            self.stdout.write(self.style.ERROR("Final totals do not match the committed donations!"))
@@ -0,0 +1,65 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from features.pdf_engine import render_report_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Render donor report PDFs of increasing length from synthetic rows and "
+        "report render time and peak Python memory for each size"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[100, 1000, 10000, 50000],
+            help="Donation row counts to render",
+        )
+        parser.add_argument("--skip-memory", action="store_true", help="Only measure render time")
+
+    def handle(self, *args, **options):
+        # Build styles outside the measurements, as a long-running worker would
+        render_report_pdf(self._stats(0), [], datetime.now())
+
+        self.stdout.write(f"{'rows':>8} {'seconds':>9} {'rows/s':>9} {'peak MB':>8} {'PDF KB':>8}")
+        for count in options["rows"]:
+            start = time.perf_counter()
+            pdf = render_report_pdf(self._stats(count), self._rows(count), datetime.now())
+            elapsed = time.perf_counter() - start
+
+            peak = "-"
+            if not options["skip_memory"]:
+                # tracemalloc slows rendering several times over, so memory gets its own run
+                tracemalloc.start()
+                render_report_pdf(self._stats(count), self._rows(count), datetime.now())
+                peak = f"{tracemalloc.get_traced_memory()[1] / 1024 / 1024:.1f}"
+                tracemalloc.stop()
+
+            self.stdout.write(
+                f"{count:>8} {elapsed:>9.2f} {count / elapsed:>9.0f} {peak:>8} {len(pdf) / 1024:>8.0f}"
+            )
+
+    def _stats(self, count):
+        return {
+            "campaign_title": "Benchmark Campaign",
+            "donor_name": "Benchmark Donor",
+            "date_from": None,
+            "date_to": None,
+            "total_donations": count,
+            "total_amount": Decimal("10.00") * count,
+        }
+
+    def _rows(self, count):
+        day = datetime(2020, 1, 1)
+        for i in range(count):
+            yield [
+                (day + timedelta(hours=i)).strftime("%Y-%m-%d"),
+                "₹10.00",
+                "UPI",
+                f"TXN{i:012d}",
+                "Completed",
+            ]
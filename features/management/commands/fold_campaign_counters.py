@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from features.services import fold_all_campaign_shards
+
+
+class Command(BaseCommand):
+    help = "Fold sharded campaign counters back into Campaign.collected_amount"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep running and fold every N seconds (default: fold once and exit)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            folded = fold_all_campaign_shards()
+            self.stdout.write(f"Folded counter shards for {folded} campaign(s)")
+            if interval <= 0:
+                break
+            time.sleep(interval)
@@ -0,0 +1,341 @@
+import http.client
+import json
+import math
+import os
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from features.management.commands.seed_benchmark_data import BENCHMARK_PASSWORD
+from features.models import Campaign
+
+# Relative weights of the actions each kind of virtual user picks from
+MEMBER_MIX = {"home": 30, "campaign_list": 20, "campaign_detail": 30, "make_donation": 10, "login": 10}
+VISITOR_MIX = {"home": 50, "campaign_detail": 40, "login_page": 10}
+HISTOGRAM_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+# Production-like server settings over plain HTTP; rate limiting would block one client IP
+SERVER_ENV = {
+    "DEBUG": "False",
+    "SECURE_SSL_REDIRECT": "False",
+    "SESSION_COOKIE_SECURE": "False",
+    "CSRF_COOKIE_SECURE": "False",
+    "RATELIMIT_ENABLE": "False",
+}
+SERVER_START_TIMEOUT = 30
+LOGIN_PATH = "/accounts/login/"
+
+
+class Client:
+    """One virtual user's keep-alive connection and cookies"""
+
+    def __init__(self, port, timeout):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        self.cookies = {}
+
+    def request(self, method, path, fields=None):
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        body = None
+        if fields is not None:
+            body = urlencode(fields)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            # The next request opens a fresh connection
+            self.connection.close()
+            raise
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+        return response.status, response.getheader("Location", "")
+
+
+class Results:
+    """Latencies, status codes and errors per endpoint, collected from every thread"""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = defaultdict(Counter)
+
+    def record(self, endpoint, elapsed_ms, status=None, error=None):
+        if time.monotonic() < self.measure_from:
+            return  # Warm-up
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            if status is not None:
+                self.statuses[endpoint][str(status)] += 1
+            if error:
+                self.errors[endpoint][error] += 1
+
+    def summary(self, duration):
+        endpoints = {name: self._summarize(name, duration) for name in sorted(self.latencies)}
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        errors = sum(sum(counts.values()) for counts in self.errors.values())
+        return {
+            "requests": requests,
+            "errors": errors,
+            "requests_per_second": round(requests / duration, 1),
+            "endpoints": endpoints,
+        }
+
+    def _summarize(self, name, duration):
+        latencies = sorted(self.latencies[name])
+        histogram = Counter()
+        for latency in latencies:
+            bound = next((bound for bound in HISTOGRAM_BOUNDS_MS if latency <= bound), None)
+            histogram[f"<={bound}ms" if bound else f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] += 1
+        return {
+            "requests": len(latencies),
+            "errors": sum(self.errors[name].values()),
+            "requests_per_second": round(len(latencies) / duration, 1),
+            "mean_ms": round(sum(latencies) / len(latencies), 1),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1),
+            "histogram": dict(histogram),
+            "status_codes": dict(self.statuses[name]),
+            "error_details": dict(self.errors[name]),
+        }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the Procfile web server against the configured database and drive mixed "
+        "anonymous and signed-in traffic at it: home, campaign list and detail pages, "
+        "donations and logins. Reports latency percentiles, histograms and errors per "
+        "endpoint and saves them as JSON. Seed the database with seed_benchmark_data first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8, help="Virtual users, one thread each")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds of measured traffic")
+        parser.add_argument("--warmup", type=float, default=5, help="Seconds of unmeasured traffic first")
+        parser.add_argument(
+            "--anonymous", type=float, default=0.25, help="Share of virtual users that never sign in"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed the users were created with")
+        parser.add_argument("--port", type=int, default=8765, help="Port for the server")
+        parser.add_argument(
+            "--no-server", action="store_true", help="Use a server already listening on --port"
+        )
+        parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+        parser.add_argument("--output", help="JSON results file (default load-test-<timestamp>.json)")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        members = concurrency - round(concurrency * options["anonymous"])
+        emails = self._member_emails(options["seed"], members)
+        self.campaign_ids = self._campaign_ids()
+        self.port = options["port"]
+        self.timeout = options["timeout"]
+
+        server = None if options["no_server"] else self._start_server()
+        try:
+            start = time.monotonic()
+            measure_from = start + options["warmup"]
+            deadline = measure_from + options["duration"]
+            self.results = Results(measure_from)
+            threads = [
+                threading.Thread(
+                    target=self._run_user,
+                    args=(i, emails[i] if i < members else None, deadline),
+                    daemon=True,
+                )
+                for i in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if server:
+                self._stop_server(server)
+
+        report = {
+            "started_at": timezone.now().isoformat(),
+            "git_commit": self._git_commit(),
+            "server": self.server_command if server else f"existing server on port {self.port}",
+            "concurrency": concurrency,
+            "signed_in_users": members,
+            "duration_seconds": options["duration"],
+            **self.results.summary(options["duration"]),
+        }
+        self._print_report(report)
+        output = options["output"] or f"load-test-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Results saved to {output}")
+
+    def _member_emails(self, seed, count):
+        if not count:
+            return []
+        emails = list(
+            get_user_model()
+            .objects.filter(email__startswith=f"bench{seed}-", is_active=True)
+            .order_by("pk")
+            .values_list("email", flat=True)[:count]
+        )
+        if not emails:
+            raise CommandError(f"No users seeded with --seed {seed}; run seed_benchmark_data first")
+        # Fewer seeded users than virtual users: several sessions share an account
+        return [emails[i % len(emails)] for i in range(count)]
+
+    def _campaign_ids(self):
+        campaigns = Campaign.objects.filter(is_active=True, end_date__gte=timezone.now().date())
+        ids = list(campaigns.order_by("pk").values_list("pk", flat=True)[:1000])
+        if not ids:
+            raise CommandError("No active campaigns to load; run seed_benchmark_data first")
+        return ids
+
+    def _start_server(self):
+        with open(settings.BASE_DIR / "Procfile") as f:
+            web = next((line for line in f if line.startswith("web:")), None)
+        if web is None:
+            raise CommandError("Procfile has no web process")
+        command = shlex.split(web[len("web:"):]) + ["--bind", f"127.0.0.1:{self.port}"]
+        self.server_command = shlex.join(command)
+
+        # With DEBUG off, static tags need the collected manifest, as after build.sh.
+        # Collect into a scratch directory so the checked-in staticfiles stay untouched
+        self.static_root = tempfile.mkdtemp(prefix="load-test-static-")
+        env = {**os.environ, **SERVER_ENV, "STATIC_ROOT": self.static_root}
+        self.stdout.write("Collecting static files...")
+        subprocess.run(
+            [sys.executable, "manage.py", "collectstatic", "--no-input", "--verbosity", "0"],
+            cwd=settings.BASE_DIR, env=env, check=True,
+        )
+
+        self.server_log = tempfile.TemporaryFile()
+        self.stdout.write(f"Starting {self.server_command}")
+        server = subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=env, stdout=self.server_log, stderr=subprocess.STDOUT
+        )
+
+        give_up = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < give_up:
+            if server.poll() is not None:
+                raise CommandError(f"Server exited with code {server.returncode}:\n{self._server_output()}")
+            try:
+                Client(self.port, timeout=5).request("GET", "/")
+                return server
+            except OSError:
+                time.sleep(0.2)
+        self._stop_server(server)
+        raise CommandError(f"Server did not answer within {SERVER_START_TIMEOUT}s:\n{self._server_output()}")
+
+    def _stop_server(self, server):
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        shutil.rmtree(self.static_root, ignore_errors=True)
+
+    def _server_output(self):
+        self.server_log.seek(0)
+        return self.server_log.read().decode(errors="replace")[-4000:]
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    # Virtual users
+
+    def _run_user(self, index, email, deadline):
+        client = Client(self.port, self.timeout)
+        rng = random.Random(index)
+        if email:
+            self._login(client, email)
+        actions, weights = zip(*(MEMBER_MIX if email else VISITOR_MIX).items())
+        while time.monotonic() < deadline:
+            action = rng.choices(actions, weights)[0]
+            if action == "home":
+                self._timed(client, "home", "GET", "/", 200)
+            elif action == "campaign_list":
+                self._timed(client, "campaign_list", "GET", "/campaigns/", 200)
+            elif action == "campaign_detail":
+                self._timed(client, "campaign_detail", "GET", f"/campaigns/{rng.choice(self.campaign_ids)}/", 200)
+            elif action == "make_donation":
+                self._timed(
+                    client, "make_donation", "POST", f"/campaigns/{rng.choice(self.campaign_ids)}/donate/", 302,
+                    {"amount": rng.randrange(10, 1000), "payment_method": "UPI"},
+                )
+            elif action == "login":
+                self._timed(client, "logout", "POST", "/accounts/logout/", 302, {})
+                self._login(client, email)
+            elif action == "login_page":
+                self._timed(client, "login_page", "GET", LOGIN_PATH, 200)
+
+    def _login(self, client, email):
+        # The login page sets the CSRF cookie the form post needs
+        self._timed(client, "login_page", "GET", LOGIN_PATH, 200)
+        self._timed(client, "login", "POST", LOGIN_PATH, 302, {"username": email, "password": BENCHMARK_PASSWORD})
+
+    def _timed(self, client, endpoint, method, path, expected_status, fields=None):
+        if fields is not None:
+            fields = {"csrfmiddlewaretoken": client.cookies.get("csrftoken", ""), **fields}
+        start = time.perf_counter()
+        try:
+            status, location = client.request(method, path, fields)
+        except (http.client.HTTPException, OSError) as e:
+            self.results.record(endpoint, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+            return
+        error = None
+        if status != expected_status:
+            error = f"HTTP {status}"
+        elif location.startswith(LOGIN_PATH):
+            # A lost session redirects to the login page instead of doing the work
+            error = "Redirected to login"
+        self.results.record(endpoint, (time.perf_counter() - start) * 1000, status=status, error=error)
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"\n{'endpoint':<16} {'requests':>9} {'errors':>7} {'req/s':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for name, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<16} {stats['requests']:>9} {stats['errors']:>7} {stats['requests_per_second']:>7} "
+                f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}"
+            )
+            for error, count in stats["error_details"].items():
+                self.stdout.write(f"  {count} x {error}")
+        self.stdout.write(
+            f"\nTotal: {report['requests']} requests, {report['errors']} errors, "
+            f"{report['requests_per_second']} req/s"
+        )
@@ -0,0 +1,41 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from features.report_jobs import claim_batch, process_batch
+
+
+class Command(BaseCommand):
+    help = "Render queued donor reports in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Rendering processes (0 renders inline)")
+        parser.add_argument("--batch-size", type=int, default=10, help="Reports claimed per batch")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+
+    def handle(self, *args, **options):
+        executor = None
+        if options["workers"] > 0:
+            # Close before the pool forks so children open their own connections
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options["workers"])
+        try:
+            while True:
+                # Long-running worker: drop connections the database has timed out
+                close_old_connections()
+                total_completed = total_failed = 0
+                while jobs := claim_batch(options["batch_size"]):
+                    completed, failed = process_batch(jobs, executor)
+                    total_completed += completed
+                    total_failed += failed
+                if total_completed or total_failed or options["once"]:
+                    self.stdout.write(f"Reports: {total_completed} completed, {total_failed} failed")
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            if executor:
+                executor.shutdown()
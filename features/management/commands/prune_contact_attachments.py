@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from features import contact_attachments
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete contact form attachments older than CONTACT_ATTACHMENT_LINK_MAX_AGE, "
+        "whose download links have all expired"
+    )
+
+    def handle(self, *args, **options):
+        deleted = contact_attachments.prune()
+        days = contact_attachments.link_max_age() / 86400
+        self.stdout.write(f"Deleted {deleted} contact attachments older than {days:g} days")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from features.models import PlatformStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the platform impact snapshot from donations and campaigns to correct drift"
+
+    def handle(self, *args, **options):
+        before = PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_PK).first()
+        stats = PlatformStats.rebuild()
+
+        for field in ("total_funds_raised", "donor_count", "projects_completed_count"):
+            old = getattr(before, field) if before else None
+            new = getattr(stats, field)
+            note = "" if old == new else f" (was {old})"
+            self.stdout.write(f"{field}: {new}{note}")
+        self.stdout.write(self.style.SUCCESS("Platform stats rebuilt."))
@@ -0,0 +1,311 @@
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import OTP
+from features.models import Campaign, Donation, DonorProfile, Expense, PlatformStats
+from features.services import apply_donation_totals
+
+# Every seeded account shares this password, so load tests can sign in
+BENCHMARK_PASSWORD = "benchmark-pass"
+
+PAYMENT_METHOD_WEIGHTS = {"UPI": 60, "CASH": 25, "BANK_TRANSFER": 15}
+STATUS_WEIGHTS = {"COMPLETED": 90, "PENDING": 6, "FAILED": 4}
+# Zipf exponent of campaign and donor popularity: a few of each get most donations
+POPULARITY_SKEW = 1.0
+# Mean of the clipped log-normal donation amounts drawn below
+MEAN_DONATION = 245
+# Largest value of the 10-digit, 2-decimal amount columns
+MAX_TOTAL = 10 ** 8 - 1
+CAMPAIGN_IMAGE_COUNT = 8
+BACKDATE_CHUNK_SIZE = 500
+EXPENSE_TITLES = ["Materials", "Transport", "Labour", "Equipment", "Printing", "Food supplies"]
+
+
+def zipf_cum_weights(count, rng):
+    """Cumulative Zipf weights over ``count`` items, ranks shuffled so ids do not predict popularity"""
+    weights = [1 / (rank + 1) ** POPULARITY_SKEW for rank in range(count)]
+    rng.shuffle(weights)
+    total = 0
+    cum_weights = []
+    for weight in weights:
+        total += weight
+        cum_weights.append(total)
+    return cum_weights
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert a reproducible synthetic dataset for benchmarks: users with donor profiles "
+        "and OTP history, campaigns with images and expenses, and donations skewed towards "
+        "a few popular campaigns and donors. The same --seed gives the same rows; dates are "
+        "relative to today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Donor accounts to create")
+        parser.add_argument("--campaigns", type=int, default=100, help="Campaigns to create")
+        parser.add_argument("--donations", type=int, default=100000, help="Donations to create")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; also tags the seeded accounts")
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Rows inserted per transaction")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["campaigns"] < 1:
+            raise CommandError("--users and --campaigns must be at least 1")
+
+        User = get_user_model()
+        self.seed = options["seed"]
+        self.chunk_size = options["chunk_size"]
+        self.email_prefix = f"bench{self.seed}-"
+        if User.objects.filter(email__startswith=self.email_prefix).exists():
+            raise CommandError(f"Data for seed {self.seed} already exists; use another --seed")
+
+        self._check_totals_fit(options["donations"], options["campaigns"])
+
+        self.rng = random.Random(self.seed)
+        self.now = timezone.now()
+        start = time.perf_counter()
+
+        user_ids = self._seed_users(options["users"])
+        self._log("users", len(user_ids), start)
+        campaigns = self._seed_campaigns(options["campaigns"])
+        self._log("campaigns", len(campaigns), start)
+        expenses = self._seed_expenses(campaigns, user_ids[0])
+        self._log("expenses", expenses, start)
+        otps = self._seed_otps(user_ids)
+        self._log("OTPs", otps, start)
+        donations_start = time.perf_counter()
+        self._seed_donations(options["donations"], campaigns, user_ids)
+        # One aggregate pass, as after an import
+        PlatformStats.rebuild()
+
+        elapsed = time.perf_counter() - start
+        donation_rate = options["donations"] / (time.perf_counter() - donations_start or 1)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids)} users, {len(campaigns)} campaigns, {expenses} expenses, "
+                f"{otps} OTPs and {options['donations']} donations in {elapsed:.1f}s "
+                f"({donation_rate:.0f} donations/s). Password for every user: {BENCHMARK_PASSWORD}"
+            )
+        )
+
+    def _check_totals_fit(self, donations, campaigns):
+        """Warn when the most popular campaign's total would overflow its column (PostgreSQL enforces it)"""
+        top_share = 1 / sum(1 / (rank + 1) ** POPULARITY_SKEW for rank in range(campaigns))
+        expected = donations * top_share * MEAN_DONATION * STATUS_WEIGHTS["COMPLETED"] / sum(STATUS_WEIGHTS.values())
+        if expected > MAX_TOTAL:
+            self.stderr.write(
+                f"The most popular campaign would collect about ₹{expected:,.0f}, more than its "
+                f"amount column holds; add campaigns or seed fewer donations."
+            )
+
+    def _log(self, label, count, start):
+        self.stdout.write(f"Created {count} {label} ({time.perf_counter() - start:.1f}s)")
+
+    def _chunks(self, objects):
+        objects = iter(objects)
+        while chunk := list(islice(objects, self.chunk_size)):
+            yield chunk
+
+    def _days_ago(self, days):
+        return self.now - timedelta(days=days, seconds=self.rng.randrange(86400))
+
+    def _seed_users(self, count):
+        User = get_user_model()
+        # Hash once: per-user hashing would take longer than the rest of the seeding
+        password = make_password(BENCHMARK_PASSWORD)
+        users = (
+            User(
+                email=f"{self.email_prefix}{i}@example.com",
+                full_name=f"Benchmark Donor {i}",
+                password=password,
+                is_active=True,
+                date_joined=self._days_ago(self.rng.randrange(1, 1095)),
+            )
+            for i in range(count)
+        )
+        for chunk in self._chunks(users):
+            User.objects.bulk_create(chunk)
+        user_ids = list(
+            User.objects.filter(email__startswith=self.email_prefix).order_by("pk").values_list("pk", flat=True)
+        )
+
+        profiles = (
+            DonorProfile(
+                user_id=user_id,
+                phone_number=f"9{self.rng.randrange(10 ** 9):09d}",
+                address=f"{self.rng.randrange(1, 500)} Village Road",
+            )
+            for user_id in user_ids
+        )
+        for chunk in self._chunks(profiles):
+            DonorProfile.objects.bulk_create(chunk)
+        return user_ids
+
+    def _campaign_images(self):
+        """A few generated images shared by the campaigns, reused across runs"""
+        names = []
+        for n in range(CAMPAIGN_IMAGE_COUNT):
+            name = f"campaign_images/benchmark-{n}.png"
+            if not default_storage.exists(name):
+                # Own generator, so whether the files already exist does not change the rows
+                image_rng = random.Random(n)
+                color = tuple(image_rng.randrange(256) for _ in range(3))
+                buffer = BytesIO()
+                Image.new("RGB", (640, 360), color).save(buffer, format="PNG")
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(name)
+        return names
+
+    def _seed_campaigns(self, count):
+        images = self._campaign_images()
+        today = self.now.date()
+        last_pk = Campaign.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        created_at = {}
+        campaigns = []
+        for i in range(count):
+            start_date = today - timedelta(days=self.rng.randrange(730))
+            end_date = start_date + timedelta(days=self.rng.randrange(30, 181))
+            campaigns.append(
+                Campaign(
+                    title=f"Benchmark Campaign {i}",
+                    description=f"Synthetic campaign {i} for benchmarks (seed {self.seed})",
+                    target_amount=Decimal(self.rng.randrange(50, 5000) * 1000),
+                    start_date=start_date,
+                    end_date=end_date,
+                    is_active=end_date >= today,
+                    image=images[i % len(images)],
+                )
+            )
+        for chunk in self._chunks(campaigns):
+            Campaign.objects.bulk_create(chunk)
+
+        seeded = list(Campaign.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "start_date", "end_date"))
+        windows = []
+        for pk, start_date, end_date in seeded:
+            opened = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+            closed = min(timezone.make_aware(datetime.combine(end_date, datetime.max.time())), self.now)
+            created_at[pk] = opened
+            windows.append((pk, opened, (closed - opened).total_seconds()))
+        # created_at is auto_now_add, so bulk_create stamps it with now; backdate it afterwards
+        self._backdate(Campaign, "created_at", created_at)
+        return windows
+
+    def _seed_expenses(self, campaigns, approver_id):
+        expenses = []
+        for pk, opened, span in campaigns:
+            for _ in range(self.rng.randrange(6)):
+                expenses.append(
+                    Expense(
+                        campaign_id=pk,
+                        title=self.rng.choice(EXPENSE_TITLES),
+                        description="Synthetic expense for benchmarks",
+                        amount=Decimal(self.rng.randrange(500, 50000)),
+                        date=(opened + timedelta(seconds=self.rng.random() * span)).date(),
+                        approved_by_id=approver_id,
+                    )
+                )
+        for chunk in self._chunks(expenses):
+            Expense.objects.bulk_create(chunk)
+        return len(expenses)
+
+    def _seed_otps(self, user_ids):
+        """Zero to three past OTPs per user; all but a recent last one are used"""
+        last_pk = OTP.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        otps, created_at = [], []
+        for user_id in user_ids:
+            for n in range(self.rng.randrange(4)):
+                salt = f"{self.rng.getrandbits(128):032x}"
+                otps.append(
+                    OTP(
+                        user_id=user_id,
+                        otp_hash=OTP.hash_otp(f"{self.rng.randrange(10 ** 6):06d}", salt),
+                        salt=salt,
+                        is_used=n > 0 or self.rng.random() < 0.8,
+                    )
+                )
+                created_at.append(self._days_ago(self.rng.randrange(1095)))
+        for chunk in self._chunks(otps):
+            OTP.objects.bulk_create(chunk)
+
+        pks = OTP.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)
+        self._backdate(OTP, "created_at", dict(zip(pks, created_at)))
+        return len(otps)
+
+    def _backdate(self, model, field, dates_by_pk):
+        """Set an auto_now_add field with one grouped UPDATE per chunk of rows"""
+        items = list(dates_by_pk.items())
+        for start in range(0, len(items), BACKDATE_CHUNK_SIZE):
+            chunk = dict(items[start:start + BACKDATE_CHUNK_SIZE])
+            model.objects.filter(pk__in=chunk).update(
+                **{
+                    field: Case(
+                        *[When(pk=pk, then=Value(date)) for pk, date in chunk.items()],
+                        output_field=models.DateTimeField(),
+                    )
+                }
+            )
+
+    def _seed_donations(self, count, campaigns, user_ids):
+        campaign_weights = zipf_cum_weights(len(campaigns), self.rng)
+        donor_weights = zipf_cum_weights(len(user_ids), self.rng)
+        methods, method_weights = zip(*PAYMENT_METHOD_WEIGHTS.items())
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+
+        # Totals are applied once at the end: per chunk, nearly every donor would
+        # need updating again, which costs more than inserting the donations
+        campaign_totals = defaultdict(Decimal)
+        donor_totals = {}
+        created = 0
+        while created < count:
+            size = min(self.chunk_size, count - created)
+            picked_campaigns = self.rng.choices(campaigns, cum_weights=campaign_weights, k=size)
+            picked_donors = self.rng.choices(user_ids, cum_weights=donor_weights, k=size)
+            picked_methods = self.rng.choices(methods, weights=method_weights, k=size)
+            picked_statuses = self.rng.choices(statuses, weights=status_weights, k=size)
+
+            donations = []
+            for n in range(size):
+                campaign_id, opened, span = picked_campaigns[n]
+                donor_id = picked_donors[n]
+                # Median around ₹150 with a long tail of large gifts
+                amount = Decimal(max(10, min(int(self.rng.lognormvariate(5, 1)), 100000)))
+                donation_date = opened + timedelta(seconds=self.rng.random() * span)
+                status = picked_statuses[n]
+                donations.append(
+                    Donation(
+                        donor_id=donor_id,
+                        campaign_id=campaign_id,
+                        amount=amount,
+                        payment_method=picked_methods[n],
+                        transaction_id=f"BENCH{self.seed}-{created + n:010d}",
+                        status=status,
+                        donation_date=donation_date,
+                        anonymous=self.rng.random() < 0.1,
+                    )
+                )
+                if status == "COMPLETED":
+                    campaign_totals[campaign_id] += amount
+                    total, latest = donor_totals.get(donor_id, (Decimal(0), donation_date))
+                    donor_totals[donor_id] = (total + amount, max(latest, donation_date))
+
+            Donation.objects.bulk_create(donations)
+            created += size
+            self.stdout.write(f"Created {created} of {count} donations...")
+
+        with transaction.atomic():
+            apply_donation_totals(campaign_totals, donor_totals)
@@ -0,0 +1,101 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable with the QUERY_PROFILER_* settings
+DEFAULT_SLOW_REQUEST_MS = 500
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+DEFAULT_WORST_QUERIES = 3
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def query_template(sql):
+    """Reduce a query to its shape, so the same query with other values compares equal"""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+class _QueryRecorder:
+    """Database execute wrapper that records the duration of every query"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def repeated_templates(self, threshold):
+        counts = Counter(query_template(sql) for sql, _ in self.queries)
+        return [(template, count) for template, count in counts.most_common() if count >= threshold]
+
+    def slowest(self, limit):
+        return sorted(self.queries, key=lambda query: query[1], reverse=True)[:limit]
+
+
+class QueryProfilerMiddleware:
+    """Count the SQL queries and time of each request.
+
+    Adds a ``Server-Timing`` header (``db`` and ``total`` durations), warns
+    when the same query template runs QUERY_PROFILER_N_PLUS_ONE_THRESHOLD
+    times or more in one request (the usual sign of an N+1 loop), and logs
+    requests slower than QUERY_PROFILER_SLOW_MS with their slowest queries.
+    Opt-in with QUERY_PROFILER=True; queries run while a streaming response
+    is being consumed are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = _QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        timing = (
+            f'db;dur={recorder.total_ms:.1f};desc="{len(recorder.queries)} queries", '
+            f"total;dur={total_ms:.1f}"
+        )
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        threshold = getattr(settings, "QUERY_PROFILER_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)
+        for template, count in recorder.repeated_templates(threshold):
+            logger.warning("Possible N+1 on %s %s: %d x %s", request.method, request.path, count, template)
+
+        slow_ms = getattr(settings, "QUERY_PROFILER_SLOW_MS", DEFAULT_SLOW_REQUEST_MS)
+        if total_ms >= slow_ms:
+            worst = getattr(settings, "QUERY_PROFILER_WORST_QUERIES", DEFAULT_WORST_QUERIES)
+            logger.warning(
+                "Slow request %s %s: %.0f ms, %d queries in %.0f ms. Slowest queries:\n%s",
+                request.method,
+                request.path,
+                total_ms,
+                len(recorder.queries),
+                recorder.total_ms,
+                "\n".join(f"  {duration:.1f} ms  {sql}" for sql, duration in recorder.slowest(worst)),
+            )
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0005_donorreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='counter_shard_count',
+            field=models.PositiveSmallIntegerField(default=8),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='use_sharded_counter',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='CampaignCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shards', to='features.campaign')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='campaigncountershard',
+            constraint=models.UniqueConstraint(fields=('campaign', 'shard'), name='unique_campaign_counter_shard'),
+        ),
+    ]
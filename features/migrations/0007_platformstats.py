@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0006_campaign_counter_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_funds_raised', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('donor_count', models.PositiveIntegerField(default=0)),
+                ('projects_completed_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'platform stats',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0007_platformstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='donation_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0008_alter_donation_donation_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donorreport',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='donorreport',
+            index=models.Index(fields=['status', 'created_at'], name='donorreport_status_idx'),
+        ),
+    ]
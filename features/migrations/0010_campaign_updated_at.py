@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0009_donorreport_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
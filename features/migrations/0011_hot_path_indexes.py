@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0010_campaign_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='features.campaign'),
+        ),
+        migrations.AlterField(
+            model_name='donation',
+            name='donor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date', 'created_at'], name='campaign_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['campaign', 'status', '-donation_date'], name='donation_campaign_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor', '-donation_date', '-id'], name='donation_donor_date_idx'),
+        ),
+    ]
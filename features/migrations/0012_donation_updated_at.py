@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
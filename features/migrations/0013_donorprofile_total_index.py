@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0012_donation_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donorprofile',
+            index=models.Index(fields=['-total_donations', '-id'], name='donorprofile_total_idx'),
+        ),
+    ]
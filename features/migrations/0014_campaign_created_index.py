@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0013_donorprofile_total_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='campaign',
+            name='campaign_active_end_idx',
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', 'end_date'], name='campaign_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['-created_at', '-id'], name='campaign_created_idx'),
+        ),
+    ]
@@ -1,8 +1,30 @@
 from django.db import models
 from django.conf import settings
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
+class CampaignQuerySet(models.QuerySet):
+    def with_live_totals(self):
+        """Annotate the amount still sitting in counter shards, not yet folded"""
+        # A correlated subquery rather than a join, so the outer query needs no
+        # GROUP BY and its filters can still use the campaign indexes
+        shard_total = (
+            CampaignCounterShard.objects.filter(campaign=OuterRef("pk"))
+            .values("campaign")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+        return self.annotate(
+            pending_shard_amount=Coalesce(
+                Subquery(shard_total),
+                Value(0),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+
+
 class Campaign(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -12,17 +34,64 @@ class Campaign(models.Model):
     end_date = models.DateField()
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Version stamp for cached campaign cards; queryset update()s of the totals must set it too
+    updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to="campaign_images/", null=True, blank=True)
+    # Spread donation writes over several counter rows for viral campaigns
+    use_sharded_counter = models.BooleanField(default=False)
+    counter_shard_count = models.PositiveSmallIntegerField(default=8)
+
+    objects = CampaignQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Active, not yet ended campaigns, newest first (home page). Partial on
+            # is_active because boolean filters compile to a bare column test;
+            # led by created_at so the page reads in order, checking end_date in the index
+            models.Index(
+                fields=["-created_at", "end_date"],
+                condition=models.Q(is_active=True),
+                name="campaign_active_end_idx",
+            ),
+            # Campaign list, newest first: the keyset seeks on this order
+            models.Index(fields=["-created_at", "-id"], name="campaign_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def live_collected_amount(self):
+        """Collected amount including shard increments that have not been folded yet"""
+        return self.collected_amount + getattr(self, "pending_shard_amount", 0)
+
     @property
     def progress_percentage(self):
         if self.target_amount > 0:
-            return (self.collected_amount / self.target_amount) * 100
+            return (self.live_collected_amount / self.target_amount) * 100
         return 0
 
+    @property
+    def is_completed(self):
+        """A campaign counts as a completed project once closed with its target reached"""
+        return not self.is_active and self.collected_amount >= self.target_amount
+
+
+class CampaignCounterShard(models.Model):
+    """A slice of a campaign's collected amount, folded back into the campaign periodically"""
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="counter_shards")
+    shard = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "shard"], name="unique_campaign_counter_shard"),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign.title} - shard {self.shard}"
+
 
 class Donation(models.Model):
     PAYMENT_METHODS = [
@@ -37,15 +106,27 @@ class Donation(models.Model):
         ("FAILED", "Failed"),
     ]
 
-    donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE)
+    # Both foreign keys lead the composite indexes in Meta, which replace the single-column ones
+    donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, db_index=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS)
     transaction_id = models.CharField(max_length=100, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
-    donation_date = models.DateTimeField(auto_now_add=True)
+    # Defaults to now; offline imports carry the real date of the donation
+    donation_date = models.DateTimeField(default=timezone.now)
     anonymous = models.BooleanField(default=False)
     message = models.TextField(blank=True, null=True)
+    # Part of the donor report cache key, so edited donations are not served stale
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Recent completed donations of a campaign (campaign page, exports, reports)
+            models.Index(fields=["campaign", "status", "-donation_date"], name="donation_campaign_status_idx"),
+            # A donor's history, newest first
+            models.Index(fields=["donor", "-donation_date", "-id"], name="donation_donor_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.donor.full_name} - ₹{self.amount} - {self.campaign.title}"
@@ -60,6 +141,12 @@ class DonorProfile(models.Model):
     last_donation_date = models.DateTimeField(null=True, blank=True)
     photo = models.ImageField(upload_to="profile_photos/", null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Donor list, top donors first: the keyset seeks on this order
+            models.Index(fields=["-total_donations", "-id"], name="donorprofile_total_idx"),
+        ]
+
     def __str__(self):
         return self.user.full_name
 
@@ -108,9 +195,14 @@ class DonorReport(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
+    # Set when a worker claims the job; see features.report_jobs
+    claimed_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='donorreport_status_idx'),
+        ]
         
     def __str__(self):
         return f"{self.user.username} - {self.campaign.title} ({self.export_format})"
@@ -124,3 +216,46 @@ class DonorReport(models.Model):
         if self.file_path:
             return self.file_path.split('/')[-1]
         return None
+
+
+class PlatformStats(models.Model):
+    """Single-row snapshot of the platform impact numbers shown on the home page.
+
+    Kept up to date incrementally as donations complete and campaigns close;
+    ``rebuild()`` recomputes it from scratch to correct any drift.
+    """
+
+    total_funds_raised = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    donor_count = models.PositiveIntegerField(default=0)
+    projects_completed_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SINGLETON_PK = 1
+
+    class Meta:
+        verbose_name_plural = "platform stats"
+
+    def __str__(self):
+        return f"Platform stats (updated {self.updated_at:%Y-%m-%d %H:%M})"
+
+    @classmethod
+    def load(cls):
+        stats = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if stats is None:
+            stats = cls.rebuild()
+        return stats
+
+    @classmethod
+    def rebuild(cls):
+        completed = Donation.objects.filter(status="COMPLETED")
+        stats, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_PK,
+            defaults={
+                "total_funds_raised": completed.aggregate(total=Sum("amount"))["total"] or 0,
+                "donor_count": completed.values("donor").distinct().count(),
+                "projects_completed_count": Campaign.objects.filter(
+                    is_active=False, collected_amount__gte=models.F("target_amount")
+                ).count(),
+            },
+        )
+        return stats
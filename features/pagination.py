@@ -0,0 +1,79 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset"""
+
+    def __init__(self, object_list, next_cursor, is_first):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, field_names):
+    """Turn a cursor back into typed field values, or None if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw_values, list) or len(raw_values) != len(field_names):
+            return None
+        return [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(field_names, raw_values)
+        ]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_paginate(queryset, cursor, ordering, page_size=20):
+    """Return the page of ``queryset`` that follows ``cursor``.
+
+    ``ordering`` is a tuple such as ``("-created_at", "-id")`` and must end in a
+    unique field so the order is total. Instead of an OFFSET scan each page
+    seeks past the last row of the previous one, so every page costs the same
+    regardless of depth. A missing or malformed cursor gives the first page.
+    """
+    field_names = [field.lstrip("-") for field in ordering]
+    queryset = queryset.order_by(*ordering)
+
+    values = decode_cursor(cursor, queryset.model, field_names) if cursor else None
+    if values is not None:
+        # Lexicographic "comes after" over the ordering fields
+        after = Q()
+        for i, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{field_names[i]}__{lookup}": values[i]})
+            for name, value in zip(field_names[:i], values[:i]):
+                step &= Q(**{name: value})
+            after |= step
+        queryset = queryset.filter(after)
+
+    rows = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, name) for name in field_names)
+    return KeysetPage(rows, next_cursor, is_first=values is None)
@@ -0,0 +1,148 @@
+"""PDF rendering for donor contribution reports.
+
+Paragraph and table styles are built once per process. Long donation
+histories are laid out as a series of page-sized tables with fixed row
+heights instead of one large table: reportlab re-measures every remaining
+row each time it splits a table across a page, which makes a single table
+quadratic in its length, while page-sized tables never need splitting.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+PAGE_MARGINS = {"rightMargin": 72, "leftMargin": 72, "topMargin": 72, "bottomMargin": 18}
+DETAIL_HEADERS = ["Date", "Amount (₹)", "Payment Method", "Transaction ID", "Status"]
+DETAIL_COL_WIDTHS = [1.2 * inch, 1 * inch, 1.2 * inch, 1.5 * inch, 1 * inch]
+DETAIL_ROW_HEIGHT = 18
+# Top and bottom padding reportlab adds inside each page frame
+FRAME_PADDING = 12
+
+
+@lru_cache(maxsize=None)
+def report_styles():
+    """Paragraph and table styles shared by every report rendered in this process"""
+    sample = getSampleStyleSheet()
+    label_table = [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]
+    return {
+        "title": ParagraphStyle(
+            "CustomTitle",
+            parent=sample["Heading1"],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=1,  # Center alignment
+            textColor=colors.HexColor("#2c3e50"),
+        ),
+        "heading": ParagraphStyle(
+            "CustomHeading",
+            parent=sample["Heading2"],
+            fontSize=14,
+            spaceAfter=12,
+            textColor=colors.HexColor("#34495e"),
+        ),
+        "normal": sample["Normal"],
+        "info_table": TableStyle(label_table),
+        "summary_table": TableStyle(label_table + [
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f8f9fa")),
+        ]),
+        "detail_table": TableStyle([
+            # Header row styling
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#3498db")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 10),
+            # Data rows styling
+            ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 1), (-1, -1), 9),
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            # Alternating row colors
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8f9fa")]),
+        ]),
+    }
+
+
+def _detail_table(rows, styles):
+    return Table(
+        [DETAIL_HEADERS] + rows,
+        colWidths=DETAIL_COL_WIDTHS,
+        rowHeights=DETAIL_ROW_HEIGHT,
+        repeatRows=1,
+        style=styles["detail_table"],
+    )
+
+
+def _detail_tables(detail_rows, rows_per_page, styles):
+    """Yield the detail section as page-sized tables, starting on a fresh page if it is long"""
+    chunk = []
+    first = True
+    for row in detail_rows:
+        chunk.append(row)
+        if len(chunk) == rows_per_page:
+            if first:
+                # More than a page of rows: start them on their own page so tables line up with pages
+                yield PageBreak()
+                first = False
+            yield _detail_table(chunk, styles)
+            chunk = []
+    if chunk:
+        yield _detail_table(chunk, styles)
+
+
+def render_report_pdf(stats, detail_rows, generated_at):
+    """Render a donor contribution report and return the PDF bytes.
+
+    ``detail_rows`` is an iterable of formatted rows matching DETAIL_HEADERS;
+    it is consumed once, one page of rows at a time.
+    """
+    styles = report_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, **PAGE_MARGINS)
+    rows_per_page = int((doc.height - FRAME_PADDING) // DETAIL_ROW_HEIGHT) - 1
+
+    elements = [
+        Paragraph("Donor Contribution Report", styles["title"]),
+        Spacer(1, 12),
+        Table(
+            [
+                ["Campaign:", stats["campaign_title"]],
+                ["Donor:", stats["donor_name"]],
+                ["Report Period:", f"{stats['date_from'] or 'All time'} to {stats['date_to'] or 'Present'}"],
+                ["Generated:", generated_at.strftime("%Y-%m-%d %H:%M:%S")],
+            ],
+            colWidths=[2 * inch, 4 * inch],
+            style=styles["info_table"],
+        ),
+        Spacer(1, 20),
+        Paragraph("Summary", styles["heading"]),
+        Table(
+            [
+                ["Total Donations:", str(stats["total_donations"])],
+                ["Total Amount:", f"₹{stats['total_amount']:.2f}"],
+            ],
+            colWidths=[2 * inch, 2 * inch],
+            style=styles["summary_table"],
+        ),
+        Spacer(1, 20),
+    ]
+
+    if stats["total_donations"]:
+        elements.append(Paragraph("Donation Details", styles["heading"]))
+        elements.extend(_detail_tables(detail_rows, rows_per_page, styles))
+    else:
+        elements.append(Paragraph("No donations found for the selected criteria.", styles["normal"]))
+
+    doc.build(elements)
+    return buffer.getvalue()
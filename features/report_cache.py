@@ -0,0 +1,140 @@
+"""Content-addressed storage for rendered donor reports.
+
+A report file is named after a hash of everything that determines its
+content: the donor, campaign, date range, format, the names printed on it
+and a watermark of the matching donations. Asking for the same report again while no donation has
+changed reuses the file. The directory is kept under REPORT_CACHE_MAX_BYTES
+by evicting the least recently used files (by modification time, which is
+refreshed on every hit). Completed reports whose file is evicted keep their
+status but lose their file, so they are not offered for download, and
+``request_report`` queues such a report again the next time it is asked for.
+
+The hit and miss counters live in the Django cache, so with the locmem
+backend each process keeps its own counts.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import DonorReport
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = "donor_reports"
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+HITS_KEY = "report_cache:hits"
+MISSES_KEY = "report_cache:misses"
+
+
+def reports_dir():
+    return os.path.join(settings.MEDIA_ROOT, REPORTS_DIR)
+
+
+def report_cache_key(user_id, campaign_id, date_from, date_to, export_format, watermark):
+    """Stable key for a report; ``watermark`` changes whenever the donations do"""
+    parts = [user_id, campaign_id, date_from, date_to, export_format.upper(), *watermark]
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _relative_path(key, extension):
+    return f"{REPORTS_DIR}/{key}.{extension}"
+
+
+def _count(metric):
+    # incr fails on a missing key, so create it first
+    cache.add(metric, 0, timeout=None)
+    try:
+        cache.incr(metric)
+    except ValueError:
+        cache.set(metric, 1, timeout=None)
+
+
+def lookup(key, extension):
+    """Return the relative path of a cached report and mark it used, or None"""
+    relative_path = _relative_path(key, extension)
+    path = os.path.join(settings.MEDIA_ROOT, relative_path)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        _count(MISSES_KEY)
+        return None
+    _count(HITS_KEY)
+    return relative_path
+
+
+def store(key, extension, content):
+    """Write a rendered report (str, bytes or byte chunks) under its key and evict old files.
+
+    Returns the relative path.
+    """
+    directory = reports_dir()
+    os.makedirs(directory, exist_ok=True)
+    relative_path = _relative_path(key, extension)
+    path = os.path.join(settings.MEDIA_ROOT, relative_path)
+
+    # Write to a temporary name and rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(content, (str, bytes)):
+                f.write(content.encode("utf-8") if isinstance(content, str) else content)
+            else:
+                # An iterable of byte chunks, written as it is produced
+                for chunk in content:
+                    f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    evict(keep=path)
+    return relative_path
+
+
+def evict(keep=None):
+    """Delete least recently used reports until the directory fits the byte budget"""
+    max_bytes = getattr(settings, "REPORT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    entries = []
+    total = 0
+    with os.scandir(reports_dir()) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith(".part"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+    evicted = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted.append(_relative_path(*os.path.basename(path).rsplit(".", 1)))
+    if evicted:
+        # Reports pointing at an evicted file can no longer be downloaded. They are
+        # not re-queued here: re-rendering would evict others in turn, forever,
+        # once the completed reports outgrow the budget
+        DonorReport.objects.filter(status="COMPLETED", file_path__in=evicted).update(
+            file_path=None, file_size=None
+        )
+        logger.info("Evicted %s cached reports", len(evicted))
+    return len(evicted)
+
+
+def stats():
+    """Hit and miss counts and the hit rate since the counters were last reset"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
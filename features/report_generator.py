@@ -2,21 +2,34 @@ import csv
 import os
 from datetime import datetime
 from decimal import Decimal
-from io import BytesIO, StringIO
+from functools import cached_property
+from io import StringIO
 from django.conf import settings
-from django.http import HttpResponse
+from django.db.models import Count, Max, Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.loader import get_template
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.platypus.flowables import HRFlowable
+from . import report_cache
+from .pdf_engine import render_report_pdf
 from .models import Donation, Campaign, DonorProfile
 
 
+# Columns fetched for the detail sections, in row tuple order
+ROW_FIELDS = ('donation_date', 'amount', 'payment_method', 'transaction_id', 'status', 'message')
+PAYMENT_METHOD_LABELS = dict(Donation.PAYMENT_METHODS)
+STATUS_LABELS = dict(Donation.STATUS_CHOICES)
+# Rows fetched per database round trip and bytes per chunk when streaming CSV
+ROW_FETCH_SIZE = 2000
+CSV_CHUNK_SIZE = 64 * 1024
+
+
 class ReportGenerator:
-    """Utility class for generating donor contribution reports in CSV and PDF formats"""
+    """Utility class for generating donor contribution reports in CSV and PDF formats
+
+    The summary comes from a single aggregate query and the detail rows are
+    fetched once as tuples, so a generator costs two queries however many
+    sections or formats it renders. iter_csv() instead streams the rows for
+    reports too large to hold in memory.
+    """
     
     def __init__(self, user, campaign, date_from=None, date_to=None):
         self.user = user
@@ -31,7 +44,7 @@ class ReportGenerator:
             donor=self.user,
             campaign=self.campaign,
             status='COMPLETED'
-        ).select_related('campaign', 'donor').order_by('-donation_date')
+        ).order_by('-donation_date', '-id')
         
         if self.date_from:
             queryset = queryset.filter(donation_date__date__gte=self.date_from)
@@ -40,214 +53,150 @@ class ReportGenerator:
             
         return queryset
     
+    @cached_property
+    def rows(self):
+        """Donation rows as plain tuples in ROW_FIELDS order, shared by every section"""
+        return list(self.donations.values_list(*ROW_FIELDS))
+
+    @cached_property
+    def _summary(self):
+        return self.donations.aggregate(
+            count=Count('id'), total=Sum('amount'), last_id=Max('id'), last_updated=Max('updated_at')
+        )
+
+    @property
+    def watermark(self):
+        """Changes whenever a matching donation is added, removed or edited, or a printed name changes"""
+        stats = self.get_report_stats()
+        return (
+            self._summary['last_id'],
+            self._summary['count'],
+            self._summary['total'],
+            self._summary['last_updated'],
+            stats['campaign_title'],
+            stats['donor_name'],
+        )
+
+    def cache_key(self, file_extension):
+        return report_cache.report_cache_key(
+            self.user.id, self.campaign.id, self.date_from, self.date_to, file_extension, self.watermark
+        )
+
     def get_report_stats(self):
         """Calculate report statistics"""
-        total_donations = self.donations.count()
-        total_amount = sum(donation.amount for donation in self.donations)
-        
         return {
-            'total_donations': total_donations,
-            'total_amount': total_amount,
+            'total_donations': self._summary['count'],
+            'total_amount': self._summary['total'] or Decimal('0'),
             'campaign_title': self.campaign.title,
-            'donor_name': f"{self.user.first_name} {self.user.last_name}".strip() or self.user.username,
+            'donor_name': f"{self.user.first_name} {self.user.last_name}".strip() or self.user.full_name,
             'date_from': self.date_from,
             'date_to': self.date_to,
         }
     
-    def generate_csv(self):
-        """Generate CSV report"""
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header information
+    def _csv_rows(self, rows):
+        """Every CSV row of the report, header sections first"""
         stats = self.get_report_stats()
-        writer.writerow(['Donor Contribution Report'])
-        writer.writerow(['Campaign:', stats['campaign_title']])
-        writer.writerow(['Donor:', stats['donor_name']])
-        writer.writerow(['Report Period:', f"{stats['date_from'] or 'All time'} to {stats['date_to'] or 'Present'}"])
-        writer.writerow(['Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-        writer.writerow([])  # Empty row
-        
-        # Write summary
-        writer.writerow(['Summary'])
-        writer.writerow(['Total Donations:', stats['total_donations']])
-        writer.writerow(['Total Amount:', f"₹{stats['total_amount']:.2f}"])
-        writer.writerow([])  # Empty row
-        
-        # Write column headers
-        writer.writerow([
+        yield ['Donor Contribution Report']
+        yield ['Campaign:', stats['campaign_title']]
+        yield ['Donor:', stats['donor_name']]
+        yield ['Report Period:', f"{stats['date_from'] or 'All time'} to {stats['date_to'] or 'Present'}"]
+        yield ['Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+        yield []  # Empty row
+
+        # Summary
+        yield ['Summary']
+        yield ['Total Donations:', stats['total_donations']]
+        yield ['Total Amount:', f"₹{stats['total_amount']:.2f}"]
+        yield []  # Empty row
+
+        # Column headers
+        yield [
             'Date',
             'Amount (₹)',
             'Payment Method',
             'Transaction ID',
             'Status',
             'Message'
-        ])
-        
-        # Write donation data
-        for donation in self.donations:
-            writer.writerow([
-                donation.donation_date.strftime('%Y-%m-%d %H:%M:%S'),
-                f"{donation.amount:.2f}",
-                donation.get_payment_method_display(),
-                donation.transaction_id or 'N/A',
-                donation.get_status_display(),
-                donation.message or 'No message'
-            ])
-        
-        return output.getvalue()
-    
-    def generate_pdf(self):
-        """Generate PDF report"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
-                              topMargin=72, bottomMargin=18)
-        
-        # Container for the 'Flowable' objects
-        elements = []
-        
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1,  # Center alignment
-            textColor=colors.HexColor('#2c3e50')
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.HexColor('#34495e')
-        )
-        
-        normal_style = styles['Normal']
-        
-        # Get report statistics
-        stats = self.get_report_stats()
-        
-        # Title
-        title = Paragraph("Donor Contribution Report", title_style)
-        elements.append(title)
-        elements.append(Spacer(1, 12))
-        
-        # Report Information
-        info_data = [
-            ['Campaign:', stats['campaign_title']],
-            ['Donor:', stats['donor_name']],
-            ['Report Period:', f"{stats['date_from'] or 'All time'} to {stats['date_to'] or 'Present'}"],
-            ['Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-        ]
-        
-        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
-        
-        # Summary Section
-        summary_heading = Paragraph("Summary", heading_style)
-        elements.append(summary_heading)
-        
-        summary_data = [
-            ['Total Donations:', str(stats['total_donations'])],
-            ['Total Amount:', f"₹{stats['total_amount']:.2f}"],
         ]
-        
-        summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8f9fa')),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 20))
-        
-        # Donations Detail Section
-        if self.donations.exists():
-            details_heading = Paragraph("Donation Details", heading_style)
-            elements.append(details_heading)
-            
-            # Table headers
-            table_data = [
-                ['Date', 'Amount (₹)', 'Payment Method', 'Transaction ID', 'Status']
+
+        # Donation data
+        for donation_date, amount, payment_method, transaction_id, status, message in rows:
+            yield [
+                donation_date.strftime('%Y-%m-%d %H:%M:%S'),
+                f"{amount:.2f}",
+                PAYMENT_METHOD_LABELS.get(payment_method, payment_method),
+                transaction_id or 'N/A',
+                STATUS_LABELS.get(status, status),
+                message or 'No message'
             ]
-            
-            # Add donation rows
-            for donation in self.donations:
-                table_data.append([
-                    donation.donation_date.strftime('%Y-%m-%d'),
-                    f"₹{donation.amount:.2f}",
-                    donation.get_payment_method_display(),
-                    donation.transaction_id or 'N/A',
-                    donation.get_status_display(),
-                ])
-            
-            # Create table
-            donations_table = Table(table_data, colWidths=[1.2*inch, 1*inch, 1.2*inch, 1.5*inch, 1*inch])
-            donations_table.setStyle(TableStyle([
-                # Header row styling
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                
-                # Data rows styling
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ]))
-            elements.append(donations_table)
+
+    def _iter_csv_text(self, rows, chunk_size):
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        for row in self._csv_rows(rows):
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def iter_csv(self, chunk_size=CSV_CHUNK_SIZE):
+        """Stream the CSV report as UTF-8 encoded chunks of about chunk_size bytes.
+
+        Unless the rows were already fetched for another format, they are read
+        from the database in batches, so memory stays flat however long the
+        donation history is. Suitable for StreamingHttpResponse or for writing
+        the report file incrementally.
+        """
+        if 'rows' in self.__dict__:
+            rows = self.rows
         else:
-            no_data = Paragraph("No donations found for the selected criteria.", normal_style)
-            elements.append(no_data)
-        
-        # Build PDF
-        doc.build(elements)
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
-        return pdf_content
+            rows = self.donations.values_list(*ROW_FIELDS).iterator(chunk_size=ROW_FETCH_SIZE)
+        for text in self._iter_csv_text(rows, chunk_size):
+            yield text.encode('utf-8')
+
+    def csv_response(self, filename):
+        """A StreamingHttpResponse that sends the CSV report as it is produced"""
+        response = StreamingHttpResponse(self.iter_csv(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def generate_csv(self):
+        """Generate CSV report"""
+        return ''.join(self._iter_csv_text(self.rows, CSV_CHUNK_SIZE))
     
+    def _pdf_rows(self):
+        for donation_date, amount, payment_method, transaction_id, status, _ in self.rows:
+            yield [
+                donation_date.strftime('%Y-%m-%d'),
+                f"₹{amount:.2f}",
+                PAYMENT_METHOD_LABELS.get(payment_method, payment_method),
+                transaction_id or 'N/A',
+                STATUS_LABELS.get(status, status),
+            ]
+
+    def generate_pdf(self):
+        """Generate PDF report"""
+        return render_report_pdf(self.get_report_stats(), self._pdf_rows(), datetime.now())
+
+    def load_cached_report(self, report_instance, file_extension):
+        """Point the report at an identical cached file; returns False on a miss"""
+        relative_path = report_cache.lookup(self.cache_key(file_extension), file_extension)
+        if relative_path is None:
+            return False
+        self._attach_file(report_instance, relative_path)
+        return True
+
     def save_report_file(self, report_instance, content, file_extension):
-        """Save report file to disk and update report instance"""
-        # Create reports directory if it doesn't exist
-        reports_dir = os.path.join(settings.MEDIA_ROOT, 'donor_reports')
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        # Generate filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"donor_report_{self.user.id}_{self.campaign.id}_{timestamp}.{file_extension}"
-        file_path = os.path.join(reports_dir, filename)
-        
-        # Save file
-        if file_extension == 'csv':
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                f.write(content)
-        else:  # PDF
-            with open(file_path, 'wb') as f:
-                f.write(content)
-        
-        # Update report instance
-        report_instance.file_path = f"donor_reports/{filename}"
+        """Save report file to the report cache and update report instance"""
+        relative_path = report_cache.store(self.cache_key(file_extension), file_extension, content)
+        return self._attach_file(report_instance, relative_path)
+
+    def _attach_file(self, report_instance, relative_path):
+        file_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+        report_instance.file_path = relative_path
         report_instance.file_size = os.path.getsize(file_path)
         report_instance.save()
-        
-        return file_path
\ No newline at end of file
+        return file_path
@@ -0,0 +1,145 @@
+"""A database-backed job queue over DonorReport rows.
+
+Requests are recorded as PENDING reports; the `process_reports` worker claims
+them, renders them with ReportGenerator in a process pool and records the
+outcome on the row.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DonorReport
+from .report_generator import ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+# A PROCESSING job older than this belongs to a worker that died and is picked up again
+DEFAULT_CLAIM_TIMEOUT_SECONDS = 1800
+
+# Fields that make two report requests interchangeable
+JOB_KEY_FIELDS = ("user_id", "campaign_id", "export_format", "date_from", "date_to")
+
+
+def _job_key(report):
+    return tuple(getattr(report, field) for field in JOB_KEY_FIELDS)
+
+
+def request_report(user, campaign, export_format, date_from=None, date_to=None):
+    """Queue a report, or return the queued one already asking for the same thing"""
+    params = {
+        "user": user,
+        "campaign": campaign,
+        "export_format": export_format,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    existing = DonorReport.objects.filter(status__in=["PENDING", "PROCESSING"], **params).first()
+    if existing:
+        return existing
+    # A completed report whose file was evicted from the report cache is rendered again
+    evicted = DonorReport.objects.filter(status="COMPLETED", file_path__isnull=True, **params).first()
+    if evicted:
+        DonorReport.objects.filter(pk=evicted.pk, status="COMPLETED", file_path__isnull=True).update(
+            status="PENDING", completed_at=None, claimed_at=None
+        )
+        evicted.refresh_from_db()
+        return evicted
+    return DonorReport.objects.create(**params)
+
+
+def claim_batch(batch_size):
+    """Claim up to batch_size jobs and group duplicates together.
+
+    Rows are locked with SKIP LOCKED where the database supports it, so
+    several workers can share the queue. Returns a list of
+    ``(report, duplicate_ids)`` pairs: only the first report of each group
+    is rendered and its result is copied to the duplicates.
+    """
+    now = timezone.now()
+    claim_timeout = getattr(settings, "REPORT_JOB_CLAIM_TIMEOUT_SECONDS", DEFAULT_CLAIM_TIMEOUT_SECONDS)
+    stale = now - timedelta(seconds=claim_timeout)
+    with transaction.atomic():
+        ids = list(
+            DonorReport.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING") | Q(status="PROCESSING", claimed_at__lt=stale))
+            .order_by("created_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if ids:
+            DonorReport.objects.filter(pk__in=ids).update(status="PROCESSING", claimed_at=now)
+
+    groups = {}
+    for report in DonorReport.objects.filter(pk__in=ids).select_related("user", "campaign").order_by("created_at"):
+        groups.setdefault(_job_key(report), (report, []))[1].append(report.pk)
+    return [(report, [pk for pk in pks if pk != report.pk]) for report, pks in groups.values()]
+
+
+def render_report(report_id):
+    """Render one claimed report and record the outcome; returns the final status.
+
+    Runs in a pool process, so it loads everything it needs by id.
+    """
+    report = DonorReport.objects.select_related("user", "campaign").get(pk=report_id)
+    try:
+        generator = ReportGenerator(report.user, report.campaign, report.date_from, report.date_to)
+        extension = "pdf" if report.export_format == "PDF" else "csv"
+        stats = generator.get_report_stats()
+        report.total_donations = stats["total_donations"]
+        report.total_amount = stats["total_amount"]
+        report.status = "COMPLETED"
+        report.completed_at = timezone.now()
+        report.error_message = None
+        # Both save the row along with the file path and size
+        if not generator.load_cached_report(report, extension):
+            content = generator.generate_pdf() if extension == "pdf" else generator.iter_csv()
+            generator.save_report_file(report, content, extension)
+    except Exception as e:
+        logger.error("Donor report %s failed: %s", report_id, e, exc_info=True)
+        DonorReport.objects.filter(pk=report_id).update(
+            status="FAILED", completed_at=timezone.now(), error_message=str(e)
+        )
+        return "FAILED"
+    return "COMPLETED"
+
+
+def _copy_result(report_id, duplicate_ids):
+    """Give merged duplicate requests the result of the report that was rendered"""
+    if not duplicate_ids:
+        return
+    report = DonorReport.objects.get(pk=report_id)
+    DonorReport.objects.filter(pk__in=duplicate_ids).update(
+        status=report.status,
+        file_path=report.file_path,
+        file_size=report.file_size,
+        total_donations=report.total_donations,
+        total_amount=report.total_amount,
+        completed_at=report.completed_at,
+        error_message=report.error_message,
+    )
+
+
+def process_batch(jobs, executor=None):
+    """Render claimed jobs, in ``executor`` when given, else inline.
+
+    Returns a (completed, failed) tuple counting every merged request.
+    """
+    if executor is None:
+        statuses = [render_report(report.pk) for report, _ in jobs]
+    else:
+        # Forked pool processes must not share the parent's database sockets
+        connections.close_all()
+        statuses = list(executor.map(render_report, [report.pk for report, _ in jobs]))
+
+    completed = failed = 0
+    for (report, duplicate_ids), status in zip(jobs, statuses):
+        _copy_result(report.pk, duplicate_ids)
+        if status == "COMPLETED":
+            completed += 1 + len(duplicate_ids)
+        else:
+            failed += 1 + len(duplicate_ids)
+    return completed, failed
@@ -0,0 +1,220 @@
+import random
+import uuid
+
+from django.db import transaction
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache import invalidate_campaigns, invalidate_donations, invalidate_stats
+from .models import Campaign, CampaignCounterShard, Donation, DonorProfile, PlatformStats
+
+
+def commit_donation(donor, campaign, amount, payment_method, anonymous=False, message=None):
+    """Record a completed donation and bump the campaign and donor totals.
+
+    Everything happens in one transaction: a single INSERT for the donation
+    followed by database-side increments (``F()`` expressions) on the campaign
+    (or one of its counter shards) and donor profile rows, so concurrent donors
+    never overwrite each other's totals and only the counter columns are written.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Treat as immediate confirmation for now; the transaction id is
+        # generated up front so the row is written exactly once.
+        donation = Donation.objects.create(
+            donor=donor,
+            campaign=campaign,
+            amount=amount,
+            payment_method=payment_method,
+            anonymous=anonymous,
+            message=message,
+            status="COMPLETED",
+            transaction_id=f"OFFLINE-{uuid.uuid4().hex[:12].upper()}",
+        )
+
+        _increment_campaign_total(campaign, amount)
+
+        first_donation = _increment_donor_total(donor, amount, now)
+
+    # The platform snapshot is a single row shared by every campaign, so it is
+    # bumped after commit to keep its row lock out of the donation transaction.
+    transaction.on_commit(lambda: record_platform_donation(amount, new_donor=first_donation))
+    return donation
+
+
+def _increment_donor_total(donor, amount, now):
+    """Add to the donor's running total; returns True if this was their first donation"""
+    increment = {"total_donations": F("total_donations") + amount, "last_donation_date": now}
+
+    # A profile that has never recorded a donation has no last_donation_date;
+    # the row lock taken by this UPDATE makes the first-donation check exact.
+    if DonorProfile.objects.filter(user=donor, last_donation_date__isnull=True).update(**increment):
+        return True
+    if DonorProfile.objects.filter(user=donor).update(**increment):
+        return False
+
+    # First donation from this user: create the profile, then apply the
+    # increment so a concurrent first donation is still counted.
+    DonorProfile.objects.get_or_create(user=donor)
+    return _increment_donor_total(donor, amount, now)
+
+
+def _increment_campaign_total(campaign, amount):
+    """Add to the campaign total, either on the campaign row or on a random counter shard"""
+    if not campaign.use_sharded_counter:
+        Campaign.objects.filter(pk=campaign.pk).update(
+            collected_amount=F("collected_amount") + amount, updated_at=timezone.now()
+        )
+        _record_completions({campaign.pk: amount})
+        return
+
+    shard = random.randrange(max(campaign.counter_shard_count, 1))
+    shard_rows = CampaignCounterShard.objects.filter(campaign_id=campaign.pk, shard=shard)
+    if not shard_rows.update(amount=F("amount") + amount):
+        CampaignCounterShard.objects.get_or_create(campaign_id=campaign.pk, shard=shard)
+        shard_rows.update(amount=F("amount") + amount)
+
+
+def fold_campaign_shards(campaign_id):
+    """Move the amounts accumulated in a campaign's counter shards into collected_amount.
+
+    Each shard is decremented by the value that was read rather than reset to
+    zero, so donations landing on a shard while the fold runs are kept for the
+    next fold. Returns the amount folded.
+    """
+    with transaction.atomic():
+        shards = list(
+            CampaignCounterShard.objects.filter(campaign_id=campaign_id)
+            .exclude(amount=0)
+            .values_list("pk", "amount")
+        )
+        folded = sum((amount for _, amount in shards), 0)
+        if not shards:
+            return folded
+
+        for pk, amount in shards:
+            CampaignCounterShard.objects.filter(pk=pk).update(amount=F("amount") - amount)
+        Campaign.objects.filter(pk=campaign_id).update(
+            collected_amount=F("collected_amount") + folded, updated_at=timezone.now()
+        )
+        _record_completions({campaign_id: folded})
+        # Live totals are unchanged, but the cached collected_amount is not
+        invalidate_campaigns(campaign_id)
+    return folded
+
+
+def fold_all_campaign_shards():
+    """Fold every campaign that has pending shard amounts; returns the number of campaigns folded"""
+    campaign_ids = (
+        CampaignCounterShard.objects.exclude(amount=0)
+        .values_list("campaign_id", flat=True)
+        .distinct()
+    )
+    folded = 0
+    for campaign_id in list(campaign_ids):
+        if fold_campaign_shards(campaign_id):
+            folded += 1
+    return folded
+
+
+def record_platform_donation(amount, new_donor=False):
+    """Add a completed donation to the platform stats snapshot"""
+    updated = PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_PK).update(
+        total_funds_raised=F("total_funds_raised") + amount,
+        donor_count=F("donor_count") + int(new_donor),
+    )
+    if not updated:
+        PlatformStats.rebuild()
+    invalidate_stats()
+
+
+def record_campaign_completion(delta):
+    """Adjust the completed projects count when a campaign closes (1) or reopens (-1)"""
+    updated = PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_PK).update(
+        projects_completed_count=F("projects_completed_count") + delta
+    )
+    if not updated:
+        PlatformStats.rebuild()
+    invalidate_stats()
+
+
+def _record_completions(campaign_amounts):
+    """Count closed campaigns that the amounts just added pushed past their target.
+
+    ``campaign_amounts`` maps campaign id to the amount added by an ``update()``,
+    which sends no signal, so the completed projects count is adjusted here.
+    Call inside the transaction that applied the update: its row locks make the
+    before and after comparison exact.
+    """
+    if not campaign_amounts:
+        return
+    added = Case(
+        *[When(pk=pk, then=Value(amount)) for pk, amount in campaign_amounts.items()],
+        default=Value(0),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+    completed = Campaign.objects.filter(
+        pk__in=campaign_amounts,
+        is_active=False,
+        collected_amount__gte=F("target_amount"),
+        collected_amount__lt=F("target_amount") + added,
+    ).count()
+    if completed:
+        transaction.on_commit(lambda: record_campaign_completion(completed))
+
+
+# Rows per grouped UPDATE, keeping the CASE expression under SQLite's bound-parameter limit
+TOTALS_UPDATE_CHUNK_SIZE = 500
+
+
+def _chunks(mapping, size):
+    items = list(mapping.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start:start + size])
+
+
+def apply_donation_totals(campaign_totals, donor_totals):
+    """Add a batch of donations to the campaign and donor totals with grouped UPDATEs.
+
+    ``campaign_totals`` maps campaign id to the amount to add and
+    ``donor_totals`` maps user id to ``(amount, latest_donation_date)``. Each
+    table gets one ``UPDATE ... CASE`` statement per 500 rows instead of one
+    per donation. Missing donor profiles are created first. Call inside the
+    transaction that inserted the donations.
+    """
+    amount_field = models.DecimalField(max_digits=10, decimal_places=2)
+
+    for chunk in _chunks(campaign_totals, TOTALS_UPDATE_CHUNK_SIZE):
+        Campaign.objects.filter(pk__in=chunk).update(
+            collected_amount=F("collected_amount") + Case(
+                *[When(pk=pk, then=Value(amount)) for pk, amount in chunk.items()],
+                default=Value(0),
+                output_field=amount_field,
+            ),
+            updated_at=timezone.now(),
+        )
+        _record_completions(chunk)
+
+    if donor_totals:
+        DonorProfile.objects.bulk_create(
+            [DonorProfile(user_id=user_id) for user_id in donor_totals], ignore_conflicts=True
+        )
+    for chunk in _chunks(donor_totals, TOTALS_UPDATE_CHUNK_SIZE):
+        latest = Case(
+            *[When(user_id=user_id, then=Value(date)) for user_id, (_, date) in chunk.items()],
+            output_field=models.DateTimeField(),
+        )
+        DonorProfile.objects.filter(user_id__in=chunk).update(
+            total_donations=F("total_donations") + Case(
+                *[When(user_id=user_id, then=Value(amount)) for user_id, (amount, _) in chunk.items()],
+                default=Value(0),
+                output_field=amount_field,
+            ),
+            last_donation_date=Greatest(Coalesce(F("last_donation_date"), latest), latest),
+        )
+
+    # bulk_create() and update() send no signals
+    invalidate_donations(*campaign_totals)
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache as data_cache
+from .models import Campaign, Donation, Expense, PlatformStats
+from .services import record_campaign_completion
+
+
+@receiver(pre_save, sender=Campaign)
+def remember_campaign_completion(sender, instance, **kwargs):
+    """Remember whether the stored campaign counted as completed before this save"""
+    instance._was_completed = False
+    if instance.pk:
+        previous = Campaign.objects.filter(pk=instance.pk).first()
+        instance._was_completed = bool(previous and previous.is_completed)
+
+
+@receiver(post_save, sender=Campaign)
+def update_completed_projects_on_save(sender, instance, **kwargs):
+    delta = int(instance.is_completed) - int(getattr(instance, "_was_completed", False))
+    if delta:
+        transaction.on_commit(lambda: record_campaign_completion(delta))
+
+
+@receiver(post_delete, sender=Campaign)
+def update_completed_projects_on_delete(sender, instance, **kwargs):
+    if instance.is_completed:
+        transaction.on_commit(lambda: record_campaign_completion(-1))
+
+
+# Cache invalidation. Writes that bypass signals (queryset update() and
+# bulk_create()) invalidate explicitly in features.services.
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_campaign_cache(sender, instance, **kwargs):
+    data_cache.invalidate_campaigns(instance.pk)
+    data_cache.invalidate_stats()
+
+
+@receiver(post_save, sender=Donation)
+@receiver(post_delete, sender=Donation)
+def invalidate_donation_cache(sender, instance, **kwargs):
+    # Runs after commit, so it also covers the F() total updates made in the same transaction
+    data_cache.invalidate_donations(instance.campaign_id)
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def invalidate_expense_cache(sender, instance, **kwargs):
+    data_cache.invalidate(data_cache.EXPENSES)
+
+
+@receiver(post_save, sender=PlatformStats)
+def invalidate_stats_cache(sender, instance, **kwargs):
+    data_cache.invalidate_stats()
@@ -1,8 +1,15 @@
-from django.test import TestCase, override_settings
-from django.core.files.uploadedfile import SimpleUploadedFile
+import re
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
 from django.core import mail
 from django.conf import settings
 from django.urls import reverse
+from accounts.outbox import deliver_pending
+from features import contact_attachments
 
 
 def contact_url():
@@ -19,36 +26,47 @@ def contact_url():
     DEFAULT_FROM_EMAIL="support@example.com",
 )
 class ContactFileUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Stored attachments go to a throwaway media root, removed after the class
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+
     def setUp(self):
         # Prepare URL
         self.contact_path = contact_url()
 
     def _init_captcha(self):
-        # Trigger GET to initialize captcha session values
-        self.client.get(self.contact_path)
-        s = self.client.session
-        # Prefer direct result if present; else compute from operands
-        result = s.get("contact_captcha")
-        if result is None:
-            a = int(s.get("contact_captcha_a", 0))
-            b = int(s.get("contact_captcha_b", 0))
-            result = str(a + b)
-        return str(result)
+        # Trigger GET to get a captcha question and its signed token
+        response = self.client.get(self.contact_path)
+        a, b = response.context["captcha_question"].split(" + ")
+        return str(int(a) + int(b)), response.context["captcha_token"]
 
     def _post_contact(self, file_obj=None, content_type=None):
-        captcha_value = self._init_captcha()
+        captcha_value, captcha_token = self._init_captcha()
         data = {
             "name": "Test User",
             "email": "user@example.com",
             "subject": "Test Upload",
             "message": "Hello with attachment.",
             "captcha": captcha_value,
+            "captcha_token": captcha_token,
         }
         if file_obj is not None:
             data["attachment"] = file_obj
-        return self.client.post(self.contact_path, data, follow=True)
+        response = self.client.post(self.contact_path, data, follow=True)
+        # Emails are queued in the outbox; deliver them like the worker would
+        deliver_pending()
+        return response
+
+    def _download_link(self, email):
+        match = re.search(r"Download \(link expires in \d+ days\): (\S+)", email.body)
+        self.assertIsNotNone(match, msg="Admin email should carry a download link.")
+        return match.group(1)
 
-    def _assert_admin_email_with_attachment(self, expected_filename: str, expected_mimetype_prefix: str):
+    def _assert_admin_email_with_attachment(self, expected_filename: str, expected_mimetype_prefix: str, expected_content: bytes):
         self.assertGreaterEqual(
             len(mail.outbox),
             2,
@@ -67,37 +85,20 @@ class ContactFileUploadTests(TestCase):
             msg="Admin email Reply-To should be the user's address.",
         )
 
-        # Attachment presence and tuple form (filename, content, mimetype)
-        self.assertGreaterEqual(
-            len(admin_email.attachments),
-            1,
-            msg="Admin email should include at least one attachment.",
-        )
-        filename, content, mimetype = admin_email.attachments[0]
-        self.assertEqual(
-            filename,
-            expected_filename,
-            msg=f"Attachment filename mismatch. Expected {expected_filename}, got {filename}.",
-        )
-        self.assertTrue(
-            isinstance(content, (bytes, bytearray)) and len(content) > 0,
-            msg="Attachment content should be non-empty bytes.",
-        )
-        self.assertTrue(
-            mimetype.startswith(expected_mimetype_prefix),
-            msg=f"Attachment mimetype should start with '{expected_mimetype_prefix}', got '{mimetype}'.",
-        )
+        # The file travels as a link, never inline
+        self.assertEqual(len(admin_email.attachments), 0, msg="Admin email should not inline the attachment.")
+        self.assertFalse(admin_email.message().is_multipart(), msg="Admin email should be a single text part.")
+        self.assertIn(f"Attachment: {expected_filename}", admin_email.body)
 
-        # Multipart structure checks
-        msg_obj = admin_email.message()
-        self.assertTrue(
-            msg_obj.is_multipart(),
-            msg="Admin email should be multipart when an attachment is present.",
-        )
+        # The link serves the original bytes as a download
+        response = self.client.get(self._download_link(admin_email))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), expected_content)
         self.assertTrue(
-            msg_obj.get_content_type().startswith("multipart"),
-            msg=f"Admin email content type should be multipart*, got '{msg_obj.get_content_type()}'.",
+            response["Content-Type"].startswith(expected_mimetype_prefix),
+            msg=f"Download content type should start with '{expected_mimetype_prefix}', got '{response['Content-Type']}'.",
         )
+        self.assertIn(f'filename="{expected_filename}"', response["Content-Disposition"])
 
         # Ack email should not include attachments
         self.assertEqual(
@@ -106,7 +107,7 @@ class ContactFileUploadTests(TestCase):
             msg="Ack email should not include attachments.",
         )
 
-    def test_pdf_attachment_delivered_multipart(self):
+    def test_pdf_attachment_delivered_by_link(self):
         file_obj = SimpleUploadedFile(
             "hello.pdf",
             b"%PDF-1.4 test content\n",
@@ -114,7 +115,7 @@ class ContactFileUploadTests(TestCase):
         )
         response = self._post_contact(file_obj)
         self.assertEqual(response.status_code, 200, msg="Expected successful request after redirect.")
-        self._assert_admin_email_with_attachment("hello.pdf", "application/pdf")
+        self._assert_admin_email_with_attachment("hello.pdf", "application/pdf", b"%PDF-1.4 test content\n")
 
     def test_zero_byte_file_rejected_no_emails(self):
         file_obj = SimpleUploadedFile(
@@ -137,7 +138,7 @@ class ContactFileUploadTests(TestCase):
         )
         response = self._post_contact(file_obj)
         self.assertEqual(response.status_code, 200, msg="Expected successful request after redirect.")
-        self._assert_admin_email_with_attachment("photo.jpg", "image/")
+        self._assert_admin_email_with_attachment("photo.jpg", "image/", b"\xff\xd8\xff test jpeg bytes")
 
     def test_octet_stream_fallback_pdf(self):
         file_obj = SimpleUploadedFile(
@@ -147,4 +148,32 @@ class ContactFileUploadTests(TestCase):
         )
         response = self._post_contact(file_obj)
         self.assertEqual(response.status_code, 200, msg="Expected successful request after redirect.")
-        self._assert_admin_email_with_attachment("file.pdf", "application/pdf")
\ No newline at end of file
+        self._assert_admin_email_with_attachment("file.pdf", "application/pdf", b"%PDF-1.4 test content\n")
+
+    def test_upload_is_spooled_to_disk(self):
+        captured = {}
+        original_store = contact_attachments.store
+
+        def store(uploaded_file):
+            captured["file"] = uploaded_file
+            return original_store(uploaded_file)
+
+        file_obj = SimpleUploadedFile("small.pdf", b"%PDF-1.4 tiny\n", content_type="application/pdf")
+        with mock.patch.object(contact_attachments, "store", side_effect=store):
+            self._post_contact(file_obj)
+        # Even a tiny upload goes to a temporary file rather than memory
+        self.assertIsInstance(captured["file"], TemporaryUploadedFile)
+
+    def test_expired_or_tampered_link_is_rejected(self):
+        self._post_contact(SimpleUploadedFile("hello.pdf", b"%PDF-1.4 test\n", content_type="application/pdf"))
+        admin_email = next(m for m in mail.outbox if settings.ADMIN_CONTACT_EMAIL in m.to)
+        link = self._download_link(admin_email)
+
+        self.assertEqual(self.client.get(link.replace("/attachments/", "/attachments/x")).status_code, 404)
+        with override_settings(CONTACT_ATTACHMENT_LINK_MAX_AGE=-1):
+            self.assertEqual(self.client.get(link).status_code, 404)
+
+    def test_post_without_csrf_token_is_rejected(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(self.contact_path, {"name": "Test User"})
+        self.assertEqual(response.status_code, 403)
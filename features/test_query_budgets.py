@@ -0,0 +1,164 @@
+"""Query budgets for every page of the site, measured against a large data set.
+
+Each URL in features.urls and accounts.urls has a fixed maximum number of
+queries for an anonymous visitor and for a signed-in staff member (staff, so
+the admin-only pages render in full). The seeded data is many times larger
+than any page size, so a query issued once per row, an N+1, adds dozens of
+queries and breaks the budget. Caches are cleared before each request, so the
+budgets cover the cold path. A page that needs more queries for a good reason
+gets its budget raised in the same change.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import CustomUser
+from .models import Campaign, Donation, DonorProfile, Expense, PlatformStats
+
+SEED_CAMPAIGNS = 2000
+SEED_DONORS = 1000
+SEED_DONATIONS = 10000
+SEED_EXPENSES = 2000
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        today = now.date()
+        # Hashing once keeps seeding fast; every seeded user shares the password
+        password = make_password("testpass123")
+
+        cls.member = CustomUser.objects.create_user(
+            email="member@example.com", full_name="Staff Member", password="testpass123",
+            is_active=True, is_staff=True,
+        )
+        donors = CustomUser.objects.bulk_create(
+            CustomUser(email=f"donor{i}@example.com", full_name=f"Donor {i}", password=password, is_active=True)
+            for i in range(SEED_DONORS)
+        )
+        DonorProfile.objects.bulk_create(
+            DonorProfile(user=user, phone_number=f"98{i:08d}", address=f"{i} Village Road", total_donations=Decimal("100.00"))
+            for i, user in enumerate([cls.member] + donors)
+        )
+        # One campaign in ten is still running, the rest have closed
+        campaigns = Campaign.objects.bulk_create(
+            Campaign(
+                title=f"Campaign {i}",
+                description="Seeded for query budgets",
+                target_amount=Decimal("5000.00"),
+                collected_amount=Decimal("100.00"),
+                start_date=today - timedelta(days=60),
+                end_date=today + timedelta(days=30) if i % 10 == 0 else today - timedelta(days=1),
+                is_active=i % 10 == 0,
+            )
+            for i in range(SEED_CAMPAIGNS)
+        )
+        cls.campaign = campaigns[0]
+        Donation.objects.bulk_create(
+            Donation(
+                # Every donation of the budgeted campaign comes from the member, so all
+                # the pages that show them are full
+                donor=cls.member if i % 20 == 0 else donors[i % SEED_DONORS],
+                campaign=cls.campaign if i % 20 == 0 else campaigns[i % SEED_CAMPAIGNS],
+                amount=Decimal("10.00"),
+                payment_method="UPI",
+                transaction_id=f"TXN{i:08d}",
+                status="COMPLETED",
+                donation_date=now - timedelta(minutes=i),
+            )
+            for i in range(SEED_DONATIONS)
+        )
+        Expense.objects.bulk_create(
+            Expense(
+                campaign=campaigns[i % SEED_CAMPAIGNS],
+                title=f"Expense {i}",
+                description="Seeded for query budgets",
+                amount=Decimal("5.00"),
+                date=today - timedelta(days=i % 60),
+                approved_by=cls.member,
+            )
+            for i in range(SEED_EXPENSES)
+        )
+        PlatformStats.rebuild()
+
+    def setUp(self):
+        cache.clear()
+
+    def budgets(self):
+        """(method, url, anonymous budget, member budget) for every URL"""
+        campaign = {"campaign_id": self.campaign.id}
+        reset_token = {
+            "uidb64": urlsafe_base64_encode(force_bytes(self.member.pk)),
+            "token": default_token_generator.make_token(self.member),
+        }
+        return [
+            # features.urls
+            ("get", reverse("features:home"), 2, 4),
+            ("get", reverse("features:about"), 0, 2),
+            ("get", "/projects/", 0, 0),
+            ("get", reverse("features:fund_usage"), 2, 4),
+            ("get", reverse("features:gallery"), 0, 2),
+            ("get", reverse("features:contact"), 0, 2),
+            ("get", reverse("features:contact_attachment", args=["expired"]), 0, 2),
+            ("get", reverse("features:faq"), 0, 2),
+            ("get", reverse("features:campaign_list"), 0, 3),
+            ("get", reverse("features:add_campaign"), 0, 2),
+            ("get", reverse("features:campaign_detail", kwargs=campaign), 2, 5),
+            ("get", reverse("features:make_donation", kwargs=campaign), 0, 3),
+            ("get", reverse("features:add_expense", kwargs=campaign), 0, 3),
+            ("get", reverse("features:download_campaign_donations", kwargs=campaign), 0, 5),
+            ("get", reverse("features:donor_profile"), 0, 5),
+            ("get", reverse("features:donor_profile_list"), 0, 3),
+            ("get", reverse("features:donation_list"), 0, 3),
+            # accounts.urls
+            ("get", reverse("register"), 0, 2),
+            ("get", reverse("verify_otp"), 0, 1),
+            ("get", reverse("login"), 0, 2),
+            ("get", reverse("resend_otp"), 4, 4),
+            ("post", reverse("logout"), 0, 4),
+            ("get", reverse("password_reset"), 0, 2),
+            ("get", reverse("password_reset_done"), 0, 2),
+            ("get", reverse("password_reset_confirm", kwargs=reset_token), 5, 3),
+            ("get", reverse("password_reset_complete"), 0, 2),
+            ("get", reverse("home"), 0, 2),
+        ]
+
+    def assertWithinBudget(self, method, url, budget):
+        cache.clear()
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = getattr(self.client, method)(url)
+            # Streamed responses run their queries while being consumed
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 500)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{method.upper()} {url} ran {len(queries)} queries, budget {budget}:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+
+    def test_anonymous_budgets(self):
+        for method, url, budget, _ in self.budgets():
+            with self.subTest(url=url):
+                self.client = self.client_class()
+                self.assertWithinBudget(method, url, budget)
+
+    def test_member_budgets(self):
+        for method, url, _, budget in self.budgets():
+            with self.subTest(url=url):
+                self.client = self.client_class()
+                self.client.force_login(self.member)
+                self.assertWithinBudget(method, url, budget)
@@ -0,0 +1,101 @@
+"""EXPLAIN-based checks that the hot queries keep using their indexes.
+
+Each query below mirrors one issued by a view or backend. On SQLite the plan
+must not contain a full table SCAN and must name the expected index. On
+PostgreSQL sequential scans are disabled for the test transaction, so any
+"Seq Scan" left in the plan means no usable index exists.
+"""
+
+import re
+from unittest import mock
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.backends import EmailBackend
+from accounts.forms import OutboxPasswordResetForm
+from accounts.models import OTP
+from .models import Campaign, Donation, DonorProfile
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                # SET LOCAL ends with the test's transaction
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        if connection.vendor == "sqlite":
+            full_scans = re.findall(r"\bSCAN (\w+)\b(?! USING)", plan)
+            self.assertEqual(full_scans, [], f"Full table scan in plan:\n{plan}")
+            self.assertIn(index_name, plan)
+        elif connection.vendor == "postgresql":
+            self.assertNotIn("Seq Scan", plan, f"Sequential scan in plan:\n{plan}")
+            self.assertIn(index_name, plan)
+        else:
+            self.skipTest(f"No plan checks for {connection.vendor}")
+
+    def test_recent_campaign_donations(self):
+        self.assertUsesIndex(
+            Donation.objects.filter(campaign_id=1, status="COMPLETED").order_by("-donation_date")[:10],
+            "donation_campaign_status_idx",
+        )
+
+    def test_user_has_donated_to_campaign(self):
+        self.assertUsesIndex(
+            Donation.objects.filter(campaign_id=1, donor_id=1, status="COMPLETED"),
+            "donation_",
+        )
+
+    def test_donor_history_page(self):
+        self.assertUsesIndex(
+            Donation.objects.filter(donor_id=1).order_by("-donation_date", "-id")[:11],
+            "donation_donor_date_idx",
+        )
+
+    def test_donor_profile_list_page(self):
+        # A later page of the keyset on ("-total_donations", "-id")
+        after = Q(total_donations__lt=100) | Q(total_donations=100, id__lt=50)
+        self.assertUsesIndex(
+            DonorProfile.objects.select_related("user").filter(after).order_by("-total_donations", "-id")[:26],
+            "donorprofile_total_idx",
+        )
+
+    def test_campaign_list_pages(self):
+        first = Campaign.objects.with_live_totals().order_by("-created_at", "-id")
+        now = timezone.now()
+        # A deep page of the keyset on ("-created_at", "-id")
+        deep = first.filter(Q(created_at__lt=now) | Q(created_at=now, id__lt=5000))
+        for queryset in (first, deep):
+            self.assertUsesIndex(queryset[:13], "campaign_created_idx")
+            self.assertNotIn("TEMP B-TREE", queryset[:13].explain())
+
+    def test_active_campaigns(self):
+        self.assertUsesIndex(
+            Campaign.objects.with_live_totals()
+            .filter(is_active=True, end_date__gte=timezone.now().date())
+            .order_by("-created_at"),
+            "campaign_active_end_idx",
+        )
+
+    def test_latest_unused_otp(self):
+        self.assertUsesIndex(
+            OTP.objects.filter(user_id=1, is_used=False).order_by("-created_at")[:1],
+            "otp_user_unused_idx",
+        )
+
+    def test_login_email_lookup(self):
+        self.assertUsesIndex(EmailBackend.users_by_email("Donor@Example.com"), "user_email_upper_idx")
+
+    def test_password_reset_email_lookup(self):
+        form = OutboxPasswordResetForm()
+        with mock.patch.object(EmailBackend, "users_by_email", wraps=EmailBackend.users_by_email) as lookup:
+            list(form.get_users("Donor@Example.com"))
+        lookup.assert_called_once_with("Donor@Example.com")
+        self.assertUsesIndex(
+            EmailBackend.users_by_email("Donor@Example.com").filter(is_active=True), "user_email_upper_idx"
+        )
@@ -1,3 +1,863 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+import openpyxl
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser, OutboxEmail
+from .models import Campaign, CampaignCounterShard, Donation, DonorProfile, DonorReport, PlatformStats
+from .middleware import QueryProfilerMiddleware, query_template
+from .pagination import encode_cursor, keyset_paginate
+from .report_generator import ReportGenerator
+from . import cache as data_cache, captcha, contact_attachments, pdf_engine, report_cache
+from .report_jobs import request_report
+from .services import apply_donation_totals, commit_donation, fold_campaign_shards
 
 # Create your tests here.
+
+
+def create_campaign(**kwargs):
+    today = timezone.now().date()
+    defaults = {
+        "title": "Clean Water",
+        "description": "Wells for the village",
+        "target_amount": Decimal("1000.00"),
+        "start_date": today,
+        "end_date": today + timedelta(days=30),
+    }
+    defaults.update(kwargs)
+    return Campaign.objects.create(**defaults)
+
+
+def create_donor(email="donor@example.com"):
+    user = CustomUser.objects.create_user(email=email, full_name="Test Donor", password="testpass123")
+    user.is_active = True
+    user.save()
+    return user
+
+
+class CommitDonationTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+
+    def test_creates_completed_donation_and_increments_totals(self):
+        donation = commit_donation(self.donor, self.campaign, Decimal("25.50"), "UPI")
+
+        self.assertEqual(donation.status, "COMPLETED")
+        self.assertTrue(donation.transaction_id.startswith("OFFLINE-"))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("25.50"))
+        profile = DonorProfile.objects.get(user=self.donor)
+        self.assertEqual(profile.total_donations, Decimal("25.50"))
+        self.assertIsNotNone(profile.last_donation_date)
+
+    def test_repeated_donations_accumulate(self):
+        commit_donation(self.donor, self.campaign, Decimal("10.00"), "CASH")
+        commit_donation(self.donor, self.campaign, Decimal("15.00"), "UPI")
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("25.00"))
+        self.assertEqual(DonorProfile.objects.get(user=self.donor).total_donations, Decimal("25.00"))
+        self.assertEqual(Donation.objects.filter(campaign=self.campaign).count(), 2)
+
+    def test_stale_campaign_instance_does_not_lose_updates(self):
+        stale = Campaign.objects.get(pk=self.campaign.pk)
+        commit_donation(self.donor, self.campaign, Decimal("10.00"), "UPI")
+        commit_donation(self.donor, stale, Decimal("5.00"), "UPI")
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("15.00"))
+
+
+class ShardedCounterTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign(use_sharded_counter=True, counter_shard_count=4)
+        self.donor = create_donor()
+
+    def test_donations_land_on_shards_not_campaign_row(self):
+        for _ in range(5):
+            commit_donation(self.donor, self.campaign, Decimal("10.00"), "UPI")
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("0"))
+        self.assertLessEqual(CampaignCounterShard.objects.filter(campaign=self.campaign).count(), 4)
+        live = Campaign.objects.with_live_totals().get(pk=self.campaign.pk)
+        self.assertEqual(live.live_collected_amount, Decimal("50.00"))
+        self.assertEqual(live.progress_percentage, Decimal("5"))
+
+    def test_fold_moves_shard_amounts_into_campaign(self):
+        for _ in range(3):
+            commit_donation(self.donor, self.campaign, Decimal("20.00"), "UPI")
+
+        self.assertEqual(fold_campaign_shards(self.campaign.pk), Decimal("60.00"))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("60.00"))
+        live = Campaign.objects.with_live_totals().get(pk=self.campaign.pk)
+        self.assertEqual(live.live_collected_amount, Decimal("60.00"))
+        self.assertEqual(fold_campaign_shards(self.campaign.pk), 0)
+
+
+class PlatformStatsTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        PlatformStats.rebuild()
+
+    def donate(self, donor, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            commit_donation(donor, self.campaign, Decimal(amount), "UPI")
+
+    def test_donations_update_snapshot_incrementally(self):
+        self.donate(self.donor, "10.00")
+        self.donate(self.donor, "5.00")
+        self.donate(create_donor("other@example.com"), "20.00")
+
+        stats = PlatformStats.load()
+        self.assertEqual(stats.total_funds_raised, Decimal("35.00"))
+        self.assertEqual(stats.donor_count, 2)
+
+    def test_closing_funded_campaign_counts_as_completed_project(self):
+        self.campaign.collected_amount = self.campaign.target_amount
+        self.campaign.save()
+        self.assertEqual(PlatformStats.load().projects_completed_count, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.is_active = False
+            self.campaign.save()
+        self.assertEqual(PlatformStats.load().projects_completed_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.is_active = True
+            self.campaign.save()
+        self.assertEqual(PlatformStats.load().projects_completed_count, 0)
+
+    def test_donations_completing_a_closed_campaign_are_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.is_active = False
+            self.campaign.save()
+        sharded = create_campaign(is_active=False, use_sharded_counter=True, counter_shard_count=2)
+        imported = create_campaign(is_active=False)
+
+        self.donate(self.donor, "999.00")
+        self.assertEqual(PlatformStats.load().projects_completed_count, 0)
+        self.donate(self.donor, "1.00")
+        self.assertEqual(PlatformStats.load().projects_completed_count, 1)
+        self.donate(self.donor, "5.00")
+        self.assertEqual(PlatformStats.load().projects_completed_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            commit_donation(self.donor, sharded, Decimal("1000.00"), "UPI")
+        self.assertEqual(PlatformStats.load().projects_completed_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            fold_campaign_shards(sharded.pk)
+        self.assertEqual(PlatformStats.load().projects_completed_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_donation_totals({imported.pk: Decimal("1500.00")}, {})
+        self.assertEqual(PlatformStats.load().projects_completed_count, 3)
+        self.assertEqual(PlatformStats.rebuild().projects_completed_count, 3)
+
+    def test_rebuild_command_corrects_drift(self):
+        self.donate(self.donor, "10.00")
+        PlatformStats.objects.update(total_funds_raised=999, donor_count=7)
+
+        call_command("rebuild_platform_stats", stdout=StringIO())
+
+        stats = PlatformStats.load()
+        self.assertEqual(stats.total_funds_raised, Decimal("10.00"))
+        self.assertEqual(stats.donor_count, 1)
+
+    def test_home_reads_snapshot(self):
+        self.donate(self.donor, "42.00")
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("features:home"))
+        self.assertEqual(response.context["total_funds_raised"], Decimal("42.00"))
+        self.assertEqual(response.context["donor_count"], 1)
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class MakeDonationViewTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        self.client.force_login(self.donor)
+
+    def test_post_records_donation(self):
+        response = self.client.post(
+            reverse("features:make_donation", args=[self.campaign.id]),
+            {"amount": "50.00", "payment_method": "UPI"},
+        )
+
+        self.assertRedirects(response, reverse("features:campaign_detail", args=[self.campaign.id]))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("50.00"))
+        self.assertEqual(Donation.objects.get().status, "COMPLETED")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Identical timestamps force the id tie-breaker to keep the order stable
+        created_at = timezone.now()
+        for i in range(7):
+            create_campaign(title=f"Campaign {i}")
+        Campaign.objects.update(created_at=created_at)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(Campaign.objects.all(), cursor, ("-created_at", "-id"), page_size=3)
+            seen.extend(campaign.pk for campaign in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        expected = list(Campaign.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_returns_first_page(self):
+        page = keyset_paginate(Campaign.objects.all(), "not-a-cursor", ("-created_at", "-id"), page_size=3)
+        self.assertTrue(page.is_first)
+        self.assertEqual(len(page), 3)
+
+    def test_page_query_uses_no_offset(self):
+        page = keyset_paginate(Campaign.objects.all(), None, ("-created_at", "-id"), page_size=3)
+        with self.assertNumQueries(1) as ctx:
+            keyset_paginate(Campaign.objects.all(), page.next_cursor, ("-created_at", "-id"), page_size=3)
+        self.assertNotIn("OFFSET", ctx.captured_queries[0]["sql"].upper())
+
+    def test_donation_list_view_paginates(self):
+        donor = create_donor()
+        campaign = Campaign.objects.first()
+        for _ in range(30):
+            commit_donation(donor, campaign, Decimal("1.00"), "UPI")
+        self.client.force_login(donor)
+
+        first = self.client.get(reverse("features:donation_list"))
+        self.assertEqual(len(first.context["donations"]), 25)
+        self.assertTrue(first.context["donations"].has_next)
+
+        second = self.client.get(
+            reverse("features:donation_list"), {"cursor": first.context["donations"].next_cursor}
+        )
+        self.assertEqual(len(second.context["donations"]), 5)
+        self.assertFalse(second.context["donations"].has_next)
+
+
+class ImportDonationsTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        commit_donation(self.donor, self.campaign, Decimal("5.00"), "UPI")
+
+    def run_import(self, csv_text, batch_size=2):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as f:
+            f.write(csv_text)
+        self.addCleanup(os.remove, path)
+        out, err = StringIO(), StringIO()
+        call_command("import_donations", path, batch_size=batch_size, stdout=out, stderr=err)
+        self.output = out.getvalue()
+        return err.getvalue()
+
+    def test_imports_rows_and_updates_totals(self):
+        errors = self.run_import(
+            "email,full_name,campaign_id,amount,payment_method,donation_date\n"
+            f"donor@example.com,Test Donor,{self.campaign.id},10.00,CASH,2024-01-15\n"
+            f"new@example.com,New Donor,{self.campaign.id},20.00,BANK_TRANSFER,2024-02-01T10:00:00\n"
+            f"new@example.com,New Donor,{self.campaign.id},30.00,cash,\n"
+        )
+
+        self.assertEqual(errors, "")
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("65.00"))
+        self.assertEqual(DonorProfile.objects.get(user=self.donor).total_donations, Decimal("15.00"))
+
+        new_user = CustomUser.objects.get(email="new@example.com")
+        self.assertFalse(new_user.has_usable_password())
+        self.assertEqual(DonorProfile.objects.get(user=new_user).total_donations, Decimal("50.00"))
+        self.assertEqual(PlatformStats.load().total_funds_raised, Decimal("65.00"))
+
+    def test_keeps_imported_donation_date(self):
+        self.run_import(
+            "email,campaign_id,amount,payment_method,donation_date\n"
+            f"donor@example.com,{self.campaign.id},10.00,CASH,2024-01-15T09:30:00\n"
+        )
+
+        donation = Donation.objects.get(payment_method="CASH")
+        self.assertEqual(donation.donation_date.date().isoformat(), "2024-01-15")
+        # An older offline gift must not move the donor's last donation date backwards
+        profile = DonorProfile.objects.get(user=self.donor)
+        self.assertEqual(profile.last_donation_date.date(), timezone.now().date())
+
+    def test_skips_invalid_rows(self):
+        errors = self.run_import(
+            "email,campaign_id,amount,payment_method\n"
+            f"donor@example.com,{self.campaign.id},10.00,UPI\n"
+            f"donor@example.com,{self.campaign.id},-1,CASH\n"
+            "donor@example.com,999999,10.00,CASH\n"
+            f"donor@example.com,{self.campaign.id},7.00,CASH\n"
+        )
+
+        self.assertIn("Line 2:", errors)
+        self.assertIn("Line 3:", errors)
+        self.assertIn("Line 4:", errors)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("12.00"))
+
+    def test_rejects_amounts_the_column_cannot_hold(self):
+        errors = self.run_import(
+            "email,campaign_id,amount,payment_method\n"
+            + "".join(
+                f"donor@example.com,{self.campaign.id},{amount},CASH\n"
+                for amount in ("NaN", "Infinity", "1e20", "1.234", "3.50")
+            )
+        )
+
+        for line in range(2, 6):
+            self.assertIn(f"Line {line}: invalid amount", errors)
+        self.assertNotIn("Line 6:", errors)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.collected_amount, Decimal("8.50"))
+
+    def test_matches_existing_donor_case_insensitively(self):
+        jane = CustomUser.objects.create_user(email="Jane@Example.com", full_name="Jane", password="x")
+        self.run_import(
+            "email,campaign_id,amount,payment_method\n"
+            f"jane@example.com,{self.campaign.id},10.00,CASH\n"
+            f"Sam@Example.com,{self.campaign.id},5.00,CASH\n"
+            f"SAM@example.com,{self.campaign.id},5.00,CASH\n",
+            batch_size=5,
+        )
+
+        self.assertEqual(Donation.objects.filter(donor=jane).count(), 1)
+        # A new donor keeps the address as written and is created once
+        sam = CustomUser.objects.get(email__iexact="sam@example.com")
+        self.assertEqual(sam.email, "Sam@Example.com")
+        self.assertEqual(Donation.objects.filter(donor=sam).count(), 2)
+        self.assertIn("1 new donors", self.output)
+
+    def test_counts_only_donors_created_by_this_run(self):
+        csv_text = (
+            "email,campaign_id,amount,payment_method\n"
+            f"first@example.com,{self.campaign.id},10.00,CASH\n"
+            f"second@example.com,{self.campaign.id},10.00,CASH\n"
+        )
+        self.run_import(csv_text)
+        self.assertIn("2 new donors", self.output)
+
+        self.run_import(csv_text)
+        self.assertIn("0 new donors", self.output)
+
+    def test_imported_donor_can_set_password_through_reset(self):
+        self.run_import(
+            "email,campaign_id,amount,payment_method\n"
+            f"new@example.com,{self.campaign.id},10.00,CASH\n"
+        )
+
+        # Matched like a login: case-insensitively, sent to the stored address
+        self.client.post(reverse("password_reset"), {"email": "NEW@example.com"})
+
+        self.assertEqual(OutboxEmail.objects.get().to, ["new@example.com"])
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+
+    def seed(self, seed=7):
+        call_command(
+            "seed_benchmark_data", users=20, campaigns=5, donations=400, seed=seed, chunk_size=150,
+            stdout=StringIO(),
+        )
+        return list(Donation.objects.order_by("pk").values_list("amount", "payment_method", "status", "donation_date"))
+
+    def test_totals_match_the_seeded_donations(self):
+        self.seed()
+
+        self.assertEqual(CustomUser.objects.count(), 20)
+        self.assertEqual(DonorProfile.objects.count(), 20)
+        self.assertEqual(Donation.objects.count(), 400)
+        for campaign in Campaign.objects.all():
+            completed = campaign.donation_set.filter(status="COMPLETED").aggregate(total=Sum("amount"))["total"]
+            self.assertEqual(campaign.collected_amount, completed or 0)
+            self.assertTrue(campaign.image.storage.exists(campaign.image.name))
+        self.assertEqual(
+            PlatformStats.load().total_funds_raised,
+            Donation.objects.filter(status="COMPLETED").aggregate(total=Sum("amount"))["total"],
+        )
+        self.assertTrue(CustomUser.objects.first().check_password("benchmark-pass"))
+
+    def test_same_seed_gives_same_rows(self):
+        first = self.seed()
+        CustomUser.objects.all().delete()
+        Campaign.objects.all().delete()
+        second = self.seed()
+
+        self.assertEqual([row[:3] for row in first], [row[:3] for row in second])
+
+    def test_donations_are_skewed_towards_popular_campaigns(self):
+        self.seed()
+
+        counts = sorted(Campaign.objects.annotate(n=Count("donation")).values_list("n", flat=True))
+        self.assertGreater(counts[-1], 2 * counts[0])
+
+    def test_refuses_to_seed_the_same_seed_twice(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+class CampaignDonationsExportTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        for amount in ("10.00", "25.50"):
+            commit_donation(self.donor, self.campaign, Decimal(amount), "UPI", message="Keep it up")
+        self.client.force_login(self.donor)
+
+    def test_download_streams_workbook(self):
+        response = self.client.get(reverse("features:download_campaign_donations", args=[self.campaign.id]))
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        ws = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = list(ws.values)
+        self.assertEqual(rows[2][0], "Total Donations: 2 | Total Amount: ₹35.50")
+        self.assertEqual(rows[4][0], "Date")
+        self.assertEqual([row[3] for row in rows[5:]], [25.5, 10.0])
+        self.assertEqual(rows[5][1], "Test Donor")
+        self.assertEqual(ws.column_dimensions["C"].width, len("donor@example.com") + 2)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        url = reverse("features:download_campaign_donations", args=[self.campaign.id])
+        with self.assertNumQueries(4) as before:
+            self.client.get(url)
+        for _ in range(20):
+            commit_donation(self.donor, self.campaign, Decimal("1.00"), "UPI")
+        with self.assertNumQueries(len(before.captured_queries)):
+            self.client.get(url)
+
+
+class ReportGeneratorTests(TestCase):
+    def setUp(self):
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        for amount in ("10.00", "15.00", "20.00"):
+            commit_donation(self.donor, self.campaign, Decimal(amount), "UPI")
+
+    def test_report_costs_one_aggregate_and_one_row_fetch(self):
+        generator = ReportGenerator(self.donor, self.campaign)
+        with self.assertNumQueries(2):
+            stats = generator.get_report_stats()
+            csv_content = generator.generate_csv()
+            pdf_content = generator.generate_pdf()
+
+        self.assertEqual(stats["total_donations"], 3)
+        self.assertEqual(stats["total_amount"], Decimal("45.00"))
+        self.assertIn("Total Amount:,₹45.00", csv_content)
+        self.assertEqual(csv_content.count(",UPI,"), 3)
+        self.assertTrue(pdf_content.startswith(b"%PDF"))
+
+    def test_iter_csv_streams_same_content_in_chunks(self):
+        generator = ReportGenerator(self.donor, self.campaign)
+        expected = generator.generate_csv()
+
+        streamed = ReportGenerator(self.donor, self.campaign)
+        chunks = list(streamed.iter_csv(chunk_size=64))
+        self.assertGreater(len(chunks), 1)
+        # Only the Generated: timestamp line may differ between the two runs
+        strip = lambda text: [line for line in text.splitlines() if not line.startswith("Generated:")]
+        self.assertEqual(strip(b"".join(chunks).decode()), strip(expected))
+
+    def test_csv_response_is_streaming(self):
+        response = ReportGenerator(self.donor, self.campaign).csv_response("report.csv")
+        self.assertTrue(response.streaming)
+        self.assertIn(b"Total Amount:,\xe2\x82\xb945.00", b"".join(response.streaming_content))
+
+    def test_long_history_renders_one_table_per_page(self):
+        rows = [["2024-01-01", "₹1.00", "UPI", f"TXN{i}", "Completed"] for i in range(200)]
+        stats = dict(ReportGenerator(self.donor, self.campaign).get_report_stats(), total_donations=200)
+
+        with mock.patch("features.pdf_engine.Table", wraps=pdf_engine.Table) as table:
+            pdf = pdf_engine.render_report_pdf(stats, iter(rows), timezone.now())
+
+        detail_tables = [c for c in table.call_args_list if c.args[0][0] == pdf_engine.DETAIL_HEADERS]
+        self.assertEqual(sum(len(c.args[0]) - 1 for c in detail_tables), 200)
+        # Summary page plus one page per detail table
+        self.assertEqual(pdf.count(b"/Type /Page\n"), len(detail_tables) + 1)
+        self.assertIs(pdf_engine.report_styles(), pdf_engine.report_styles())
+
+    def test_empty_report(self):
+        generator = ReportGenerator(create_donor("other@example.com"), self.campaign)
+        self.assertEqual(generator.get_report_stats()["total_amount"], Decimal("0"))
+        self.assertTrue(generator.generate_pdf().startswith(b"%PDF"))
+
+
+def use_temp_media_root(test):
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    test.enterContext(override_settings(MEDIA_ROOT=media_root))
+    return media_root
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        commit_donation(self.donor, self.campaign, Decimal("12.00"), "UPI")
+
+    def run_worker(self):
+        out = StringIO()
+        call_command("process_reports", workers=0, once=True, stdout=out)
+        return out.getvalue()
+
+    def test_worker_renders_pending_report(self):
+        report = request_report(self.donor, self.campaign, "CSV")
+
+        self.assertIn("1 completed, 0 failed", self.run_worker())
+        report.refresh_from_db()
+        self.assertEqual(report.status, "COMPLETED")
+        self.assertIsNotNone(report.completed_at)
+        self.assertEqual(report.total_amount, Decimal("12.00"))
+        self.assertTrue(os.path.exists(os.path.join(settings.MEDIA_ROOT, report.file_path)))
+
+    def test_identical_requests_are_merged(self):
+        first = request_report(self.donor, self.campaign, "PDF")
+        self.assertEqual(request_report(self.donor, self.campaign, "PDF"), first)
+
+        # A duplicate that slipped in concurrently is rendered once and shares the file
+        duplicate = DonorReport.objects.create(user=self.donor, campaign=self.campaign, export_format="PDF")
+        self.run_worker()
+
+        first.refresh_from_db()
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.status, "COMPLETED")
+        self.assertEqual(duplicate.file_path, first.file_path)
+
+    def test_failure_is_recorded(self):
+        report = request_report(self.donor, self.campaign, "CSV")
+        with mock.patch("features.report_jobs.ReportGenerator.iter_csv", side_effect=RuntimeError("boom")):
+            self.assertIn("0 completed, 1 failed", self.run_worker())
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "FAILED")
+        self.assertEqual(report.error_message, "boom")
+        self.assertIsNotNone(report.completed_at)
+
+
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        self.media_root = use_temp_media_root(self)
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+        commit_donation(self.donor, self.campaign, Decimal("12.00"), "UPI")
+        cache.clear()
+
+    def render(self):
+        report = request_report(self.donor, self.campaign, "CSV")
+        call_command("process_reports", workers=0, once=True, stdout=StringIO())
+        report.refresh_from_db()
+        return report
+
+    def test_repeat_request_reuses_file_until_donations_change(self):
+        first = self.render()
+        with mock.patch.object(ReportGenerator, "iter_csv") as iter_csv:
+            second = self.render()
+        iter_csv.assert_not_called()
+        self.assertEqual(second.file_path, first.file_path)
+
+        commit_donation(self.donor, self.campaign, Decimal("1.00"), "UPI")
+        third = self.render()
+        self.assertNotEqual(third.file_path, first.file_path)
+        self.assertEqual(report_cache.stats(), {"hits": 1, "misses": 2, "hit_rate": 1 / 3})
+
+    def test_evicts_least_recently_used_files_over_budget(self):
+        old = report_cache.store("a" * 64, "csv", "x" * 100)
+        recent = report_cache.store("b" * 64, "csv", "y" * 100)
+        os.utime(os.path.join(self.media_root, old), (1, 1))
+        os.utime(os.path.join(self.media_root, recent), (2, 2))
+
+        with self.settings(REPORT_CACHE_MAX_BYTES=250):
+            newest = report_cache.store("c" * 64, "csv", "z" * 100)
+
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, old)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, recent)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, newest)))
+
+    def test_report_whose_file_is_evicted_is_no_longer_ready(self):
+        report = self.render()
+        self.assertTrue(report.is_ready)
+        os.utime(os.path.join(self.media_root, report.file_path), (1, 1))
+
+        with self.settings(REPORT_CACHE_MAX_BYTES=0):
+            report_cache.store("c" * 64, "csv", "z" * 100)
+
+        report.refresh_from_db()
+        self.assertFalse(report.is_ready)
+        self.assertEqual(report.status, "COMPLETED")
+        self.assertIsNone(report.error_message)
+
+        # Asking for it again re-renders the same report
+        self.assertEqual(request_report(self.donor, self.campaign, "CSV").pk, report.pk)
+        report.refresh_from_db()
+        self.assertEqual(report.status, "PENDING")
+        call_command("process_reports", workers=0, once=True, stdout=StringIO())
+        report.refresh_from_db()
+        self.assertTrue(report.is_ready)
+
+    def test_edits_that_change_report_contents_miss_the_cache(self):
+        first = self.render()
+        donation = Donation.objects.get()
+        donation.message = "In memory of grandma"
+        donation.save()
+        second = self.render()
+        self.assertNotEqual(second.file_path, first.file_path)
+
+        Campaign.objects.filter(pk=self.campaign.pk).update(title="Renamed Campaign")
+        self.campaign.refresh_from_db()
+        third = self.render()
+        self.assertNotEqual(third.file_path, second.file_path)
+
+        self.donor.full_name = "Renamed Donor"
+        self.donor.save()
+        fourth = self.render()
+        self.assertNotEqual(fourth.file_path, third.file_path)
+        self.assertEqual(report_cache.stats()["hits"], 0)
+
+
+class DataCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = create_campaign()
+        self.donor = create_donor()
+
+    def donate(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            commit_donation(self.donor, self.campaign, Decimal(amount), "UPI")
+
+    def test_home_served_from_cache_until_a_donation(self):
+        self.donate("10.00")
+        self.client.get(reverse("features:home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("features:home"))
+        self.assertEqual(response.context["total_funds_raised"], Decimal("10.00"))
+
+        self.donate("5.00")
+        response = self.client.get(reverse("features:home"))
+        self.assertEqual(response.context["total_funds_raised"], Decimal("15.00"))
+        self.assertEqual(response.context["active_campaigns"][0].live_collected_amount, Decimal("15.00"))
+
+    def test_campaign_detail_invalidated_by_save(self):
+        url = reverse("features:campaign_detail", args=[self.campaign.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.title = "Solar Lamps"
+            self.campaign.save()
+        self.assertEqual(self.client.get(url).context["campaign"].title, "Solar Lamps")
+
+    def test_missing_campaign_is_404(self):
+        response = self.client.get(reverse("features:campaign_detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_totals_update_invalidates(self):
+        self.assertEqual(data_cache.get_campaign(self.campaign.id).collected_amount, Decimal("0"))
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_donation_totals({self.campaign.id: Decimal("7.00")}, {})
+        self.assertEqual(data_cache.get_campaign(self.campaign.id).collected_amount, Decimal("7.00"))
+
+    def test_file_cache_stays_coherent_across_workers(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        file_cache = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                                  "LOCATION": location}}
+        with self.settings(CACHES=file_cache):
+            self.assertEqual(data_cache.get_campaign(self.campaign.id).title, "Clean Water")
+            Campaign.objects.filter(pk=self.campaign.id).update(title="Solar Lamps")
+            # Still cached: update() sends no signal
+            self.assertEqual(data_cache.get_campaign(self.campaign.id).title, "Clean Water")
+
+            # Another worker, with its own cache backend instance, invalidates the campaign
+            worker = threading.Thread(target=data_cache.invalidate_campaigns, args=[self.campaign.id])
+            worker.start()
+            worker.join()
+
+            self.assertEqual(data_cache.get_campaign(self.campaign.id).title, "Solar Lamps")
+
+    def test_cached_donations_carry_only_display_fields(self):
+        self.donate("10.00")
+        recent = data_cache.get_recent_donations(self.campaign.id)
+        donations, _ = data_cache.get_fund_usage()
+        for donation in (recent[0], donations[0]):
+            self.assertEqual(donation.donor.full_name, self.donor.full_name)
+            self.assertIn("password", donation.donor.get_deferred_fields())
+            self.assertIn("email", donation.donor.get_deferred_fields())
+        self.assertEqual(donations[0].campaign.title, "Clean Water")
+
+    def test_campaign_page_keyed_on_decoded_cursor(self):
+        for i in range(3):
+            create_campaign(title=f"Campaign {i}")
+        first = data_cache.get_campaign_page(None, 2)
+        cursor = first.next_cursor
+        self.assertEqual(
+            [c.pk for c in data_cache.get_campaign_page(cursor, 2)],
+            [c.pk for c in data_cache.get_campaign_page(cursor + "==", 2)],
+        )
+        with self.assertNumQueries(1):
+            # Only the check that the cursor points at a campaign
+            data_cache.get_campaign_page(cursor, 2)
+
+        # Cursors that point at no campaign are served uncached
+        with mock.patch.object(data_cache, "get_or_build") as get_or_build:
+            for cursor in ("garbage", encode_cursor([timezone.now(), 999999])):
+                self.assertEqual(len(data_cache.get_campaign_page(cursor, 2)), 2)
+        get_or_build.assert_not_called()
+
+
+class CampaignCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = create_campaign()
+        self.other = create_campaign(title="Solar Lamps")
+        self.donor = create_donor()
+
+    def render_home(self):
+        with mock.patch.object(
+            Campaign, "progress_percentage", new_callable=mock.PropertyMock, return_value=50
+        ) as progress:
+            response = self.client.get(reverse("features:home"))
+        return response, progress.call_count
+
+    def test_only_changed_cards_rerender(self):
+        self.client.get(reverse("features:home"))
+        _, calls = self.render_home()
+        self.assertEqual(calls, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            commit_donation(self.donor, self.campaign, Decimal("100.00"), "UPI")
+        response, calls = self.render_home()
+        # Two progress lookups per card, for the changed campaign only
+        self.assertEqual(calls, 2)
+        self.assertContains(response, "Raised: ₹100")
+
+    def test_actions_stay_outside_cached_fragment(self):
+        self.client.force_login(self.donor)
+        self.client.get(reverse("features:campaign_list"))
+        response = self.client.get(reverse("features:campaign_list"))
+        self.assertContains(
+            response, reverse("features:download_campaign_donations", args=[self.campaign.id])
+        )
+
+
+class QueryProfilerMiddlewareTests(TestCase):
+    def setUp(self):
+        for i in range(6):
+            create_campaign(title=f"Campaign {i}")
+
+    def profile(self, view):
+        return QueryProfilerMiddleware(view)(RequestFactory().get("/campaigns/"))
+
+    def test_server_timing_counts_queries(self):
+        def view(request):
+            list(Campaign.objects.all())
+            return HttpResponse("ok")
+
+        response = self.profile(view)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="1 queries", total;dur=[\d.]+$')
+
+    def test_flags_repeated_query_templates(self):
+        def view(request):
+            for pk in Campaign.objects.values_list("pk", flat=True):
+                Campaign.objects.get(pk=pk)
+            return HttpResponse("ok")
+
+        with self.assertLogs("features.middleware", "WARNING") as logs:
+            self.profile(view)
+        self.assertIn("Possible N+1 on GET /campaigns/: 6 x", logs.output[0])
+
+    @override_settings(QUERY_PROFILER_SLOW_MS=0)
+    def test_logs_slow_requests_with_worst_queries(self):
+        def view(request):
+            Campaign.objects.count()
+            return HttpResponse("ok")
+
+        with self.assertLogs("features.middleware", "WARNING") as logs:
+            self.profile(view)
+        self.assertIn("Slow request GET /campaigns/", logs.output[0])
+        self.assertIn("COUNT(*)", logs.output[0])
+
+    def test_query_template_ignores_values(self):
+        self.assertEqual(
+            query_template("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a'"),
+            query_template("SELECT * FROM t WHERE id IN (%s) AND name = 'b'"),
+        )
+
+
+class ContactCaptchaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def answer(self, question):
+        a, b = question.split(" + ")
+        return int(a) + int(b)
+
+    def test_contact_page_stores_nothing(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("features:contact"))
+        self.assertContains(response, response.context["captcha_token"])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_token_is_accepted_once(self):
+        question, token = captcha.issue()
+        self.assertTrue(captcha.verify(token, self.answer(question)))
+        self.assertFalse(captcha.verify(token, self.answer(question)))
+
+    def test_wrong_answer_spends_token(self):
+        question, token = captcha.issue()
+        self.assertFalse(captcha.verify(token, self.answer(question) + 1))
+        self.assertFalse(captcha.verify(token, self.answer(question)))
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        question, token = captcha.issue()
+        self.assertFalse(captcha.verify(token[:-1] + ("A" if token[-1] != "A" else "B"), self.answer(question)))
+        with mock.patch.object(captcha, "TOKEN_MAX_AGE", -1):
+            self.assertFalse(captcha.verify(token, self.answer(question)))
+
+
+class PruneContactAttachmentsTests(TestCase):
+    def setUp(self):
+        self.media_root = use_temp_media_root(self)
+
+    def test_removes_attachments_older_than_their_links(self):
+        old = contact_attachments.store(ContentFile(b"old", name="old.pdf"))
+        new = contact_attachments.store(ContentFile(b"new", name="new.pdf"))
+        eight_days_ago = (timezone.now() - timedelta(days=8)).timestamp()
+        os.utime(os.path.join(self.media_root, old), (eight_days_ago, eight_days_ago))
+
+        out = StringIO()
+        call_command("prune_contact_attachments", stdout=out)
+
+        self.assertIn("Deleted 1 contact attachments older than 7 days", out.getvalue())
+        self.assertFalse(default_storage.exists(os.path.dirname(old)))
+        self.assertTrue(default_storage.exists(new))
@@ -8,10 +8,11 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("about/", views.about, name="about"),
     # Redirect projects to campaigns to consolidate functionality
-    re_path(r'^projects(/.*)?$', RedirectView.as_view(pattern_name='features:campaign_list', permanent=True)),
+    re_path(r'^projects(?:/.*)?$', RedirectView.as_view(pattern_name='features:campaign_list', permanent=True)),
     path("fund-usage/", views.fund_usage, name="fund_usage"),
     path("gallery/", views.gallery, name="gallery"),
     path("contact/", views.contact, name="contact"),
+    path("contact/attachments/<str:token>/", views.contact_attachment, name="contact_attachment"),
     path("faq/", views.faq, name="faq"),
     path("campaigns/", views.campaign_list, name="campaign_list"),
     path("campaigns/add/", views.add_campaign, name="add_campaign"),
@@ -3,61 +3,55 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse, Http404
+from django.http import FileResponse, HttpResponse, JsonResponse, Http404
 from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from django.core.exceptions import PermissionDenied
 from django.conf import settings
 from .models import Campaign, Donation, DonorProfile, Expense
 from .forms import CampaignForm, DonationForm, DonorProfileForm, ExpenseForm, ContactForm
-from django.db import models
-from django.core.mail import send_mail
-from django.core.mail import EmailMessage
+from . import cache as data_cache
+from . import captcha, contact_attachments
+from .exports import XLSX_CONTENT_TYPE, campaign_donations_xlsx_file
+from .pagination import keyset_paginate
+from .services import commit_donation
+from accounts.email_service import EmailService
+from django.db import models, transaction
 from django.template.loader import render_to_string
 import os
 import mimetypes
 from datetime import datetime
 import uuid
 import logging
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
-from io import BytesIO
 logger = logging.getLogger(__name__)
 
+# Page sizes for the keyset-paginated list views
+CAMPAIGN_PAGE_SIZE = 12
+DONATION_PAGE_SIZE = 25
+DONATION_HISTORY_PAGE_SIZE = 10
+DONOR_PROFILE_PAGE_SIZE = 25
+
 
 def home(request):
-    active_campaigns = Campaign.objects.filter(
-        is_active=True, end_date__gte=timezone.now().date()
-    ).order_by("-created_at")
-
-    # Impact Stats
-    total_funds_raised = (
-        Donation.objects.filter(status="COMPLETED").aggregate(total=Sum("amount"))[
-            "total"
-        ]
-        or 0
-    )
-    donor_count = (
-        Donation.objects.filter(status="COMPLETED").values("donor").distinct().count()
-    )
-    projects_completed_count = Campaign.objects.filter(
-        is_active=False, collected_amount__gte=models.F("target_amount")
-    ).count()
+    # Impact Stats, maintained incrementally (see PlatformStats)
+    stats = data_cache.get_platform_stats()
 
     context = {
-        "active_campaigns": active_campaigns,
-        "total_funds_raised": total_funds_raised,
-        "donor_count": donor_count,
-        "projects_completed_count": projects_completed_count,
+        "active_campaigns": data_cache.get_active_campaigns(timezone.now().date()),
+        "total_funds_raised": stats.total_funds_raised,
+        "donor_count": stats.donor_count,
+        "projects_completed_count": stats.projects_completed_count,
     }
     return render(request, "features/home.html", context)
 
 
 def campaign_detail(request, campaign_id):
-    campaign = get_object_or_404(Campaign, pk=campaign_id)
-    donations = Donation.objects.filter(
-        campaign=campaign, status="COMPLETED"
-    ).order_by("-donation_date")[:10]
+    campaign = data_cache.get_campaign(campaign_id)
+    if campaign is None:
+        raise Http404("Campaign not found")
+    donations = data_cache.get_recent_donations(campaign.id)
 
     # Check if the current user has donated to this campaign
     user_has_donated = False
@@ -84,38 +78,27 @@ def make_donation(request, campaign_id):
     if request.method == "POST":
         form = DonationForm(request.POST)
         if form.is_valid():
-            donation = form.save(commit=False)
-            donation.donor = request.user
-            donation.campaign = campaign
-            # Ensure initial status is pending until payment is confirmed
-            donation.status = "PENDING"
-            donation.save()
-
-            # Treat as immediate confirmation for now
-            donation.status = "COMPLETED"
-            donation.transaction_id = f"OFFLINE-{donation.id}"
-            donation.save()
-
-            campaign.collected_amount += donation.amount
-            campaign.save()
-
-            profile, created = DonorProfile.objects.get_or_create(user=request.user)
-            profile.total_donations += donation.amount
-            profile.last_donation_date = timezone.now()
-            profile.save()
-
-            subject = "Thank you for your donation!"
-            message = render_to_string(
-                "features/email/thank_you.html",
-                {"donation": donation, "campaign": campaign, "user": request.user},
-            )
-            send_mail(
-                subject,
-                "",
-                "noreply@villagefunds.com",
-                [request.user.email],
-                html_message=message,
-            )
+            with transaction.atomic():
+                donation = commit_donation(
+                    donor=request.user,
+                    campaign=campaign,
+                    amount=form.cleaned_data["amount"],
+                    payment_method=form.cleaned_data["payment_method"],
+                )
+
+                # Queued in the donation transaction; delivered by the outbox worker
+                subject = "Thank you for your donation!"
+                message = render_to_string(
+                    "features/email/thank_you.html",
+                    {"donation": donation, "campaign": campaign, "user": request.user},
+                )
+                EmailService.queue_email(
+                    subject,
+                    "",
+                    [request.user.email],
+                    html_message=message,
+                    from_email="noreply@villagefunds.com",
+                )
 
             messages.success(request, "Thank you for your donation!")
             return redirect("features:campaign_detail", campaign_id=campaign.id)
@@ -131,8 +114,13 @@ def make_donation(request, campaign_id):
 
 @login_required
 def donor_profile(request):
-    profile, created = DonorProfile.objects.get_or_create(user=request.user)
-    donations = Donation.objects.filter(donor=request.user).order_by("-donation_date")
+    profile, created = DonorProfile.objects.select_related("user").get_or_create(user=request.user)
+    donations = keyset_paginate(
+        Donation.objects.filter(donor=request.user).select_related("campaign"),
+        request.GET.get("cursor"),
+        ("-donation_date", "-id"),
+        page_size=DONATION_HISTORY_PAGE_SIZE,
+    )
     donations_completed_count = Donation.objects.filter(
         donor=request.user, status="COMPLETED"
     ).count()
@@ -169,7 +157,7 @@ def donor_profile(request):
 
 @login_required
 def campaign_list(request):
-    campaigns = Campaign.objects.all().order_by("-created_at")
+    campaigns = data_cache.get_campaign_page(request.GET.get("cursor"), CAMPAIGN_PAGE_SIZE)
     return render(request, "features/campaign_list.html", {"campaigns": campaigns})
 
 
@@ -208,10 +196,7 @@ def add_expense(request, campaign_id):
     )
 
 def fund_usage(request):
-    donations = Donation.objects.filter(status="COMPLETED").order_by("-donation_date")[
-        :50
-    ]
-    expenses = Expense.objects.all().order_by("-date")[:50]
+    donations, expenses = data_cache.get_fund_usage()
     return render(
         request,
         "features/fund_usage.html",
@@ -229,43 +214,37 @@ def gallery(request):
     return render(request, "features/gallery.html", {"gallery_items": gallery_items})
 
 
+@csrf_exempt
 def contact(request):
-    # Math CAPTCHA setup
+    # Spool uploads to a temporary file rather than memory. Upload handlers must
+    # be set before anything reads request.POST, which includes the CSRF check,
+    # so that check runs in _contact instead.
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+    return _contact(request)
+
+
+@csrf_protect
+def _contact(request):
+    # Math CAPTCHA carried in a signed form token, so a page view stores nothing
     if request.method == "GET":
-        try:
-            import random
-            a = random.randint(1, 9)
-            b = random.randint(1, 9)
-            expected = a + b
-            request.session["contact_captcha_a"] = a
-            request.session["contact_captcha_b"] = b
-            request.session["contact_captcha"] = expected
-            request.session.modified = True
-        except Exception:
-            a, b, expected = 2, 3, 5
-            request.session["contact_captcha_a"] = a
-            request.session["contact_captcha_b"] = b
-            request.session["contact_captcha"] = expected
-            request.session.modified = True
-        form = ContactForm(expected_captcha=expected)
+        captcha_question, captcha_token = captcha.issue()
+        form = ContactForm()
         return render(
             request,
             "features/contact.html",
             {
                 "form": form,
-                "captcha_question": f"{a} + {b}",
+                "captcha_question": captcha_question,
+                "captcha_token": captcha_token,
                 "instructions": "Fill in all required fields. Attach relevant files if needed. Solve the simple math CAPTCHA to verify you are human.",
             },
         )
 
     # POST: validate and deliver
-    a = request.session.get("contact_captcha_a", 0)
-    b = request.session.get("contact_captcha_b", 0)
-    expected = request.session.get("contact_captcha", None)
-    form = ContactForm(request.POST, request.FILES, expected_captcha=expected)
+    form = ContactForm(request.POST, request.FILES, captcha_token=request.POST.get("captcha_token"))
 
-    # Ensure these are available for any re-render paths
-    captcha_question = f"{a} + {b}"
+    # Submitted tokens are spent, so any re-render asks a fresh question
+    captcha_question, captcha_token = captcha.issue()
     instructions = "Please correct the highlighted fields."
 
     if form.is_valid():
@@ -283,7 +262,12 @@ def contact(request):
             return render(
                 request,
                 "features/contact.html",
-                {"form": form, "instructions": instructions, "captcha_question": captcha_question},
+                {
+                    "form": form,
+                    "instructions": instructions,
+                    "captcha_question": captcha_question,
+                    "captcha_token": captcha_token,
+                },
             )
 
         # Compose admin email
@@ -299,55 +283,45 @@ def contact(request):
             f"Category: {data.get('category') or 'Not specified'}\n"
             f"Message:\n{data['message']}\n"
         )
-        admin_email = EmailMessage(
-            admin_subject,
-            admin_body,
-            from_email,
-            [admin_recipient],
-            reply_to=[data["email"]],
-        )
+        admin_email = {
+            "subject": admin_subject,
+            "message": admin_body,
+            "recipient_list": [admin_recipient],
+            "from_email": from_email,
+            "reply_to": [data["email"]],
+        }
 
         # Robust attachment handling
+        # Attachments go to media storage; the email only carries a signed link
         attachment = data.get("attachment")
         if attachment:
             try:
-                try:
-                    attachment.seek(0)
-                except Exception:
-                    pass
                 filename = os.path.basename(getattr(attachment, "name", "attachment"))
                 guessed = mimetypes.guess_type(filename)[0]
                 ct = getattr(attachment, "content_type", None)
                 content_type = ct if (ct and ct != "application/octet-stream") else (
                     guessed or "application/pdf" if filename.lower().endswith(".pdf") else "application/octet-stream"
                 )
-                if hasattr(attachment, "temporary_file_path"):
-                    admin_email.attach_file(attachment.temporary_file_path(), mimetype=content_type)
-                else:
-                    content = attachment.read()
-                    admin_email.attach(filename, content, content_type)
+                stored_name = contact_attachments.store(attachment)
+                link = contact_attachments.download_url(request, stored_name, content_type)
+                link_days = contact_attachments.link_max_age() // 86400
+                admin_email["message"] += (
+                    f"\nAttachment: {filename} ({getattr(attachment, 'size', 'unknown')} bytes, {content_type})\n"
+                    f"Download (link expires in {link_days} days): {link}\n"
+                )
                 logger.info(
-                    "Attached file to contact email: name=%s size=%s content_type=%s guessed=%s type=%s",
+                    "Stored contact attachment: name=%s size=%s content_type=%s guessed=%s path=%s",
                     filename,
                     getattr(attachment, "size", "unknown"),
                     content_type,
                     guessed,
-                    type(attachment).__name__,
+                    stored_name,
                 )
             except Exception as e:
-                logger.error("Failed to attach file to admin email: %s", e, exc_info=True)
+                logger.error("Failed to store contact attachment: %s", e, exc_info=True)
                 messages.warning(request, "Attachment couldn't be added. Your message was sent without the file.")
 
-        # Send admin email safely
-        admin_sent = True
-        try:
-            admin_email.send(fail_silently=False)
-        except Exception as e:
-            admin_sent = False
-            logger.error("Admin email send failed: %s", e, exc_info=True)
-            messages.warning(request, "We couldn't deliver your message to support at the moment.")
-
-        # Send acknowledgment to user (never blocks the request)
+        # Acknowledgment to the user
         ack_subject = f"We received your message (Ticket {ticket_id})"
         ack_body = (
             f"Hello {data['name']},\n\n"
@@ -358,18 +332,17 @@ def contact(request):
             f"Your message:\n{data['message']}\n\n"
             f"Best regards,\nSupport Team"
         )
-        ack_email = EmailMessage(ack_subject, ack_body, from_email, [data["email"]])
-        ack_email.send(fail_silently=True)
+        ack_email = {"subject": ack_subject, "message": ack_body, "recipient_list": [data["email"]]}
 
-        # Clear captcha session
-        request.session.pop("contact_captcha_a", None)
-        request.session.pop("contact_captcha_b", None)
-        request.session.pop("contact_captcha", None)
-
-        if admin_sent:
-            messages.success(request, "Your message has been sent. We've emailed a confirmation.")
+        # Queue both emails in one insert; the outbox worker delivers them over one connection
+        try:
+            with transaction.atomic():
+                EmailService.queue_bulk([admin_email, ack_email])
+        except Exception as e:
+            logger.error("Contact email queueing failed: %s", e, exc_info=True)
+            messages.warning(request, "We couldn't deliver your message to support at the moment.")
         else:
-            messages.success(request, "We received your submission. We've emailed a confirmation.")
+            messages.success(request, "Your message has been sent. We've emailed a confirmation.")
 
         return redirect("features:contact")
 
@@ -377,7 +350,27 @@ def contact(request):
     return render(
         request,
         "features/contact.html",
-        {"form": form, "captcha_question": captcha_question, "instructions": instructions},
+        {
+            "form": form,
+            "captcha_question": captcha_question,
+            "captcha_token": captcha_token,
+            "instructions": instructions,
+        },
+    )
+
+
+def contact_attachment(request, token):
+    """Serve a contact form attachment from a signed link in the admin email."""
+    link = contact_attachments.load(token)
+    if link is None:
+        raise Http404("This download link is invalid or has expired.")
+    name, content_type = link
+    try:
+        file = default_storage.open(name, "rb")
+    except FileNotFoundError:
+        raise Http404("Attachment not found")
+    return FileResponse(
+        file, as_attachment=True, filename=os.path.basename(name), content_type=content_type
     )
 
 
@@ -388,7 +381,12 @@ def faq(request):
 @login_required
 def donation_list(request):
     """Display a list of donations for the current user"""
-    donations = Donation.objects.filter(donor=request.user).order_by("-donation_date")
+    donations = keyset_paginate(
+        Donation.objects.filter(donor=request.user).select_related("campaign"),
+        request.GET.get("cursor"),
+        ("-donation_date", "-id"),
+        page_size=DONATION_PAGE_SIZE,
+    )
     return render(request, "features/donation_list.html", {"donations": donations})
 
 
@@ -398,8 +396,16 @@ def donor_profile_list(request):
     if not request.user.is_staff:
         messages.error(request, "You don't have permission to view this page.")
         return redirect("features:home")
-    
-    profiles = DonorProfile.objects.all().order_by("-total_donations")
+
+    # Ranked by total, which moves as donations arrive: a donor whose total
+    # changes between page loads can reappear on a later page or be skipped.
+    # The ranking is the point of this list, so that is accepted.
+    profiles = keyset_paginate(
+        DonorProfile.objects.select_related("user"),
+        request.GET.get("cursor"),
+        ("-total_donations", "-id"),
+        page_size=DONOR_PROFILE_PAGE_SIZE,
+    )
     return render(request, "features/donor_profile_list.html", {"profiles": profiles})
 
 
@@ -417,105 +423,12 @@ def get_client_ip(request):
 def download_campaign_donations(request, campaign_id):
     """Download all donations for a specific campaign as an Excel file"""
     campaign = get_object_or_404(Campaign, id=campaign_id)
-    
-    # Get all completed donations for this campaign
-    donations = Donation.objects.filter(
-        campaign=campaign,
-        status='COMPLETED'
-    ).select_related('donor').order_by('-donation_date')
-    
-    # Create Excel workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"{campaign.title} - Donations"
-    
-    # Header styling
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Campaign info section
-    ws.merge_cells('A1:H1')
-    ws['A1'] = f"Donations Report - {campaign.title}"
-    ws['A1'].font = Font(bold=True, size=16)
-    ws['A1'].alignment = Alignment(horizontal="center")
-    
-    ws.merge_cells('A2:H2')
-    ws['A2'] = f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    ws['A2'].alignment = Alignment(horizontal="center")
-    
-    ws.merge_cells('A3:H3')
-    ws['A3'] = f"Total Donations: {donations.count()} | Total Amount: ₹{donations.aggregate(total=Sum('amount'))['total'] or 0:.2f}"
-    ws['A3'].alignment = Alignment(horizontal="center")
-    ws['A3'].font = Font(bold=True)
-    
-    # Empty row
-    ws.append([])
-    
-    # Headers
-    headers = [
-        'Date', 'Donor Name', 'Email', 'Amount (₹)', 'Payment Method', 
-        'Transaction ID', 'Status', 'Message'
-    ]
-    
-    header_row = ws.max_row + 1
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=header_row, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-    
-    # Data rows
-    for donation in donations:
-        donor_name = "Anonymous"
-        donor_email = ""
-        
-        if donation.donor:
-            donor_name = f"{donation.donor.first_name} {donation.donor.last_name}".strip() or donation.donor.username
-            donor_email = donation.donor.email
-        
-        row_data = [
-            donation.donation_date.strftime('%Y-%m-%d %H:%M:%S'),
-            donor_name,
-            donor_email,
-            float(donation.amount),
-            donation.payment_method,
-            donation.transaction_id or '',
-            donation.status,
-            donation.message or ''
-        ]
-        ws.append(row_data)
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Format amount column as INR currency
-    amount_col = 4  # Column D
-    for row in range(header_row + 1, ws.max_row + 1):
-        cell = ws.cell(row=row, column=amount_col)
-        cell.number_format = '₹#,##0.00'
-    
-    # Save to BytesIO
-    excel_file = BytesIO()
-    wb.save(excel_file)
-    excel_file.seek(0)
-    
-    # Create response
+
     filename = f"{campaign.title.replace(' ', '_')}_donations_{timezone.now().strftime('%Y%m%d')}.xlsx"
-    response = HttpResponse(
-        excel_file.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # Streamed from a temporary file in blocks; FileResponse closes (and so removes) it
+    return FileResponse(
+        campaign_donations_xlsx_file(campaign),
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE,
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
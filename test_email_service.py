@@ -32,8 +32,8 @@ def test_email_service():
     """Test that EmailService correctly uses PASSWORD_RESET_DOMAIN and PASSWORD_RESET_PROTOCOL settings."""
     print("\nTesting EmailService...\n")
     
-    # Patch send_mail where it's imported in the EmailService module
-    with patch('accounts.email_service.send_mail') as mock_send_mail, \
+    # Patch the outbox writer so nothing is queued in the database
+    with patch('accounts.email_service.EmailService.queue_email') as mock_send_mail, \
          patch('accounts.email_service.default_token_generator') as mock_token_generator, \
          patch('accounts.email_service.urlsafe_base64_encode') as mock_base64_encode:
         